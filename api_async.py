@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+
+import asyncio
+import inspect
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from api_idp import ApiIdp
+from api_rules import ApiRules
+from api_users import ApiUsers
+from api_groups import ApiGroups
+from api_servers import ApiServers
+from api_contexts import ApiContexts
+from api_networks import ApiNetworks
+from api_transport import ApiTransport
+from api_client_connectors import ApiClientConnectors
+
+
+class AsyncApi:
+    """
+    A base class for the awaitable api classes. Every method of the
+    wrapped api class is available under the same name as a coroutine.
+    Calls run on the shared, pooled session in a thread pool sized to
+    the connection pool, so asyncio.gather over many calls keeps every
+    pooled connection busy without opening extra ones.
+    """
+
+    api_class = None
+    executor = None
+    executor_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Initializes the wrapper. The wrapped api object, and the login
+        it needs, are created on the first awaited call.
+
+        Returns:
+            None.
+        """
+
+        self.api = None
+        self.api_lock = asyncio.Lock()
+
+    @classmethod
+    def get_executor(cls):
+        """
+        Returns the thread pool shared by all awaitable api classes.
+
+        Returns:
+            (obj): concurrent.futures thread pool executor.
+        """
+
+        if AsyncApi.executor is None:
+            with AsyncApi.executor_lock:
+                if AsyncApi.executor is None:
+                    AsyncApi.executor = ThreadPoolExecutor(
+                        max_workers=ApiTransport().pool_maxsize,
+                        thread_name_prefix="sdwc-async"
+                    )
+        return AsyncApi.executor
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs a blocking call in the shared thread pool. The caller's
+        context variables are visible inside the call.
+
+        Args:
+            - func (callable): the blocking function.
+            - args (list): positional arguments for func.
+            - kwargs (dict): keyword arguments for func.
+
+        Returns:
+            the result of func.
+        """
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.get_executor(), call)
+
+    async def resource(self):
+        """
+        Returns the wrapped api object, creating it on first use.
+
+        Returns:
+            (obj): an instance of api_class.
+        """
+
+        async with self.api_lock:
+            if self.api is None:
+                self.api = await self.run(self.api_class)
+        return self.api
+
+    def __getattr__(self, name):
+        """
+        Exposes the methods of api_class as coroutines. Generator
+        methods such as iter_all become async generators that read the
+        next object in the thread pool.
+
+        Args:
+            - name (str): the method name.
+
+        Returns:
+            (coroutine function): the awaitable method.
+        """
+
+        method = getattr(self.api_class, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+
+        if inspect.isgeneratorfunction(method):
+
+            @functools.wraps(method)
+            async def iterate(*args, **kwargs):
+                api = await self.resource()
+                items = getattr(api, name)(*args, **kwargs)
+                done = object()
+                try:
+                    while True:
+                        item = await self.run(next, items, done)
+                        if item is done:
+                            break
+                        yield item
+                finally:
+                    items.close()
+
+            return iterate
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            api = await self.resource()
+            return await self.run(getattr(api, name), *args, **kwargs)
+
+        return call
+
+
+class AsyncApiUsers(AsyncApi):
+    """
+    Awaitable counterpart of ApiUsers.
+    """
+
+    api_class = ApiUsers
+
+
+class AsyncApiGroups(AsyncApi):
+    """
+    Awaitable counterpart of ApiGroups.
+    """
+
+    api_class = ApiGroups
+
+
+class AsyncApiRules(AsyncApi):
+    """
+    Awaitable counterpart of ApiRules.
+    """
+
+    api_class = ApiRules
+
+
+class AsyncApiContexts(AsyncApi):
+    """
+    Awaitable counterpart of ApiContexts.
+    """
+
+    api_class = ApiContexts
+
+
+class AsyncApiNetworks(AsyncApi):
+    """
+    Awaitable counterpart of ApiNetworks.
+    """
+
+    api_class = ApiNetworks
+
+
+class AsyncApiServers(AsyncApi):
+    """
+    Awaitable counterpart of ApiServers.
+    """
+
+    api_class = ApiServers
+
+
+class AsyncApiClientConnectors(AsyncApi):
+    """
+    Awaitable counterpart of ApiClientConnectors.
+    """
+
+    api_class = ApiClientConnectors
+
+
+class AsyncApiIdp(AsyncApi):
+    """
+    Awaitable counterpart of ApiIdp.
+    """
+
+    api_class = ApiIdp
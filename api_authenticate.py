@@ -1,10 +1,15 @@
 #!/usr/bin/python3
 
 import os
+import time
+import threading
 import requests
 from api_helper import ApiHelper
+from api_transport import ApiTransport
+from api_token_cache import ApiTokenCache, REFRESH_MARGIN
 
 VERSION = "v1.1"
+TOKEN_LIFETIME = 900
 
 try:
     SDWC_API_KEY = os.environ["SDWC_API_KEY"]
@@ -15,9 +20,14 @@ except KeyError:
 
 class ApiAuthenticate:
     """
-    A class for authentication related api calls.
+    A class for authentication related api calls. Logins are shared
+    process-wide, so every api class reuses a single session per base
+    url and api key.
     """
 
+    logins = {}
+    logins_lock = threading.Lock()
+
     def __init__(self):
         """
         Initializes the authorization headers with the api key.
@@ -27,16 +37,70 @@ class ApiAuthenticate:
         """
 
         self.api_key = os.environ["SDWC_API_KEY"]
+        self.base_url = SDWC_BASE_URL
         self.headers = {
             "accept": "application/json;charset=UTF-8",
             "Authorization": f"{self.api_key}"
         }
+        self.token_url = (
+            f"{self.base_url}/login-accounts/{VERSION}/"
+            "auths/apis/oauth/token"
+        )
+        self.token_cache = None
+        if ApiTokenCache.enabled():
+            self.token_cache = ApiTokenCache(self.base_url, self.api_key)
+        self.background_refresh = os.environ.get(
+            "SDWC_TOKEN_REFRESH", ""
+        ).lower() == "background"
+        self.session = None
+        self.token = None
+        self.token_lock = threading.Lock()
+        self.refresh_timer = None
 
     def login(self):
+        """
+        Returns the shared session for this base url and api key. The
+        first call in the process executes the login, later calls reuse
+        the session and its connection pool.
+
+        Returns:
+            dict:
+                - session (obj): session header with access token.
+                - org_id (str): the accounts org id number.
+        """
+
+        key = (self.base_url, self.api_key)
+        with ApiAuthenticate.logins_lock:
+            if key not in ApiAuthenticate.logins:
+                ApiAuthenticate.logins[key] = self.new_login()
+            return ApiAuthenticate.logins[key]
+
+    def logout(self):
+        """
+        Drops the shared session for this base url and api key so the
+        next call to login authenticates again.
+
+        Returns:
+            None.
+        """
+
+        key = (self.base_url, self.api_key)
+        with ApiAuthenticate.logins_lock:
+            auth = ApiAuthenticate.logins.pop(key, None)
+        if auth is not None:
+            auth["session"].auth.cancel_refresh()
+            auth["session"].close()
+
+    def new_login(self):
         """
         Executes login with provided api key. If successful, returns
         a session object with access token and provides org id number
-        for subsequent api calls.
+        for subsequent api calls. When the token cache is enabled a
+        cached token that is not near expiry is used instead.
+
+        The session uses the pooled transport from api_transport.py and
+        keeps this object as its auth handler, so the token is refreshed
+        ahead of expiry and on 401 for every request made through it.
 
         Returns:
             dict:
@@ -45,18 +109,200 @@ class ApiAuthenticate:
         """
 
         session = requests.Session()
+        ApiTransport().mount(session)
         session.headers.update(self.headers)
-        url = (
-            f"{SDWC_BASE_URL}/login-accounts/{VERSION}/"
-            "auths/apis/oauth/token"
+        self.session = session
+
+        token = None
+        if self.token_cache is not None:
+            token = self.token_cache.load()
+        if token is None:
+            token = self.request_token()
+
+        self.apply_token(token)
+        session.auth = self
+        session.hooks["response"].append(self.handle_401)
+        return {"session": session, "org_id": token["orgId"]}
+
+    def __call__(self, request):
+        """
+        Sets the authorization header on an outgoing request, first
+        refreshing the token if it is within REFRESH_MARGIN seconds
+        of expiry. Requests to the token endpoint use the api key.
+
+        Args:
+            - request (obj): requests library prepared request.
+
+        Returns:
+            request (obj): the request with the authorization header.
+        """
+
+        if request.url == self.token_url:
+            return request
+
+        token = self.token
+        if token["expires_at"] - REFRESH_MARGIN <= time.time():
+            token = self.refresh(token)
+        request.headers["authorization"] = self.auth_header(token)
+        request.sdwc_token = token
+        return request
+
+    def request_token(self):
+        """
+        Requests a new access token with the api key and stores it in
+        the token cache when enabled.
+
+        Returns:
+            token (dict):
+                - access_token (str): the bearer token.
+                - token_type (str): the authorization scheme.
+                - orgId (str): the accounts org id number.
+                - expires_at (float): epoch time the token expires.
+        """
+
+        auth = ApiHelper().http(
+            "POST", self.session, self.token_url, headers=self.headers,
+            idempotent=True
         )
-        auth = ApiHelper().http("POST", session, url)
-        auth = ApiHelper().parse(auth["content"])
-        token_type = auth["token_type"]
-        access_token = auth["access_token"]
-        org_id = auth["meta"]["orgId"]
-        auth_header = {
-            "authorization": f"{token_type} {access_token}"
+        auth = ApiHelper().parse(auth)
+        lifetime = auth.get("expires_in") or TOKEN_LIFETIME
+        token = {
+            "access_token": auth["access_token"],
+            "token_type": auth["token_type"],
+            "orgId": auth["meta"]["orgId"],
+            "expires_at": time.time() + float(lifetime),
         }
-        session.headers.update(auth_header)
-        return {"session": session, "org_id": org_id}
+        if self.token_cache is not None:
+            self.token_cache.save(token)
+        return token
+
+    def refresh(self, stale_token):
+        """
+        Replaces a stale token. Concurrent callers holding the same
+        stale token share a single login; callers arriving after it
+        finished get the new token without another login.
+
+        Args:
+            - stale_token (dict): the token the caller found unusable.
+
+        Returns:
+            token (dict): the current token.
+        """
+
+        with self.token_lock:
+            if self.token is stale_token:
+                if self.token_cache is not None:
+                    self.token_cache.delete()
+                self.apply_token(self.request_token())
+            return self.token
+
+    def apply_token(self, token):
+        """
+        Makes the token current and, when background refresh is
+        enabled, schedules its renewal ahead of expiry.
+
+        Args:
+            - token (dict): access_token, token_type, expires_at.
+
+        Returns:
+            None.
+        """
+
+        self.token = token
+        if self.background_refresh:
+            self.schedule_refresh(token)
+
+    def auth_header(self, token):
+        """
+        Formats the authorization header value for a token.
+
+        Args:
+            - token (dict): access_token and token_type.
+
+        Returns:
+            (str): the authorization header value.
+        """
+
+        return f"{token['token_type']} {token['access_token']}"
+
+    def schedule_refresh(self, token):
+        """
+        Starts a daemon timer that refreshes the token REFRESH_MARGIN
+        seconds before it expires.
+
+        Args:
+            - token (dict): the token to renew.
+
+        Returns:
+            None.
+        """
+
+        self.cancel_refresh()
+        delay = token["expires_at"] - REFRESH_MARGIN - time.time()
+        self.refresh_timer = threading.Timer(
+            max(delay, 0), self.refresh_in_background, args=(token,)
+        )
+        self.refresh_timer.daemon = True
+        self.refresh_timer.start()
+
+    def refresh_in_background(self, token):
+        """
+        Timer target for background refresh. A failed refresh is left
+        to the next request, which refreshes the token inline.
+
+        Args:
+            - token (dict): the token to renew.
+
+        Returns:
+            None.
+        """
+
+        try:
+            self.refresh(token)
+        except Exception:
+            pass
+
+    def cancel_refresh(self):
+        """
+        Stops a pending background refresh.
+
+        Returns:
+            None.
+        """
+
+        if self.refresh_timer is not None:
+            self.refresh_timer.cancel()
+            self.refresh_timer = None
+
+    def handle_401(self, response, **kwargs):
+        """
+        A session response hook. When the server rejects the access
+        token, the token is refreshed and the request is sent once
+        more with it.
+
+        Args:
+            - response (obj): requests library response object.
+            - kwargs (dict): send arguments such as timeout and stream.
+
+        Returns:
+            response (obj): the original or the replayed response.
+        """
+
+        request = response.request
+        if response.status_code != 401 or request.url == self.token_url:
+            return response
+        if getattr(request, "sdwc_replayed", False):
+            return response
+
+        stale_token = getattr(request, "sdwc_token", self.token)
+        token = self.refresh(stale_token)
+
+        response.content
+        response.close()
+        replay = request.copy()
+        replay.headers["authorization"] = self.auth_header(token)
+        replay.sdwc_replayed = True
+        new_response = response.connection.send(replay, **kwargs)
+        new_response.history.append(response)
+        new_response.request = replay
+        return new_response
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+
+import os
+import time
+import threading
+
+CACHE_TTL = 60
+
+
+class ApiCache:
+    """
+    A class for caching a collection and its name index. One cache is
+    shared per collection url by all instances of an api class.
+    """
+
+    caches = {}
+    caches_lock = threading.Lock()
+
+    def __init__(self, id_key, ttl=None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            - id_key (str): the field holding the object id, e.g. userId.
+            - ttl (float): seconds the index stays valid, SDWC_CACHE_TTL,
+              0 disables caching.
+
+        Returns:
+            None.
+        """
+
+        if ttl is None:
+            ttl = float(os.environ.get("SDWC_CACHE_TTL", CACHE_TTL))
+        self.id_key = id_key
+        self.ttl = ttl
+        self.index = {}
+        self.names = {}
+        self.loaded = None
+        self.lock = threading.RLock()
+
+    @classmethod
+    def for_url(cls, url, id_key):
+        """
+        Returns the shared cache for a collection url.
+
+        Args:
+            - url (str): the collection endpoint.
+            - id_key (str): the field holding the object id.
+
+        Returns:
+            (ApiCache): the cache for the url.
+        """
+
+        with cls.caches_lock:
+            if url not in cls.caches:
+                cls.caches[url] = cls(id_key)
+            return cls.caches[url]
+
+    @classmethod
+    def invalidate_all(cls):
+        """
+        Drops the contents of every cache.
+
+        Returns:
+            None.
+        """
+
+        with cls.caches_lock:
+            caches = list(cls.caches.values())
+        for cache in caches:
+            cache.invalidate()
+
+    def fresh(self):
+        """
+        Checks whether the index was loaded within the ttl.
+
+        Returns:
+            (boolean): True if the index can be used.
+        """
+
+        if self.loaded is None:
+            return False
+        return time.monotonic() - self.loaded < self.ttl
+
+    def update(self, items):
+        """
+        Rebuilds the name index from a full collection. If a name is
+        used more than once the first object wins, as with a scan.
+
+        Args:
+            - items (list(dict)): the collection from get_all.
+
+        Returns:
+            None.
+        """
+
+        if not isinstance(items, list):
+            return
+        index = {}
+        names = {}
+        for item in items:
+            index.setdefault(item.get("name"), item)
+            names.setdefault(item.get(self.id_key), item.get("name"))
+        with self.lock:
+            self.index = index
+            self.names = names
+            self.loaded = time.monotonic()
+
+    def insert(self, item):
+        """
+        Adds an object returned by a successful create to the index.
+        Responses without a name and id, such as errors, are ignored.
+
+        Args:
+            - item (dict): the created object.
+
+        Returns:
+            None.
+        """
+
+        if not isinstance(item, dict):
+            return
+        name = item.get("name")
+        object_id = item.get(self.id_key)
+        if name is None or object_id is None:
+            return
+        with self.lock:
+            if self.loaded is None:
+                return
+            self.index.setdefault(name, item)
+            self.names.setdefault(object_id, name)
+
+    def evict(self, object_id):
+        """
+        Removes a deleted object from the index. If another object has
+        the same name the index is dropped instead, so the next lookup
+        finds that object by loading the collection again.
+
+        Args:
+            - object_id (str): id of the deleted object.
+
+        Returns:
+            None.
+        """
+
+        with self.lock:
+            name = self.names.pop(object_id, None)
+            item = self.index.get(name)
+            if item is None or item.get(self.id_key) != object_id:
+                return
+            if name in self.names.values():
+                self.invalidate()
+            else:
+                del self.index[name]
+
+    def lookup(self, name, fetch):
+        """
+        Finds an object by name, loading the collection with fetch if
+        the index is missing or expired. Concurrent callers share one
+        load.
+
+        Args:
+            - name (str): name of the object.
+            - fetch (callable): loads the collection and calls update.
+
+        Returns:
+            item (dict): the collection entry or None if not found.
+        """
+
+        with self.lock:
+            if not self.fresh():
+                fetch()
+            return self.index.get(name)
+
+    def lookup_many(self, names, fetch):
+        """
+        Finds several objects by name with at most one collection load.
+
+        Args:
+            - names (list(str)): names of the objects.
+            - fetch (callable): loads the collection and calls update.
+
+        Returns:
+            items (dict): collection entry per name, None if not found.
+        """
+
+        with self.lock:
+            if not self.fresh():
+                fetch()
+            return {name: self.index.get(name) for name in names}
+
+    def invalidate(self):
+        """
+        Drops the index so the next lookup loads the collection.
+
+        Returns:
+            None.
+        """
+
+        with self.lock:
+            self.index = {}
+            self.names = {}
+            self.loaded = None
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+
+import os
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+CODECS = ("orjson", "ujson", "json")
+
+
+class ApiCodec:
+    """
+    A class for encoding and decoding json with the fastest library
+    available. orjson is preferred, then ujson, then the standard
+    library.
+    """
+
+    def __init__(self, name=None):
+        """
+        Initializes the codec.
+
+        Args:
+            - name (str): orjson, ujson or json, SDWC_JSON_CODEC, picks
+              the first installed library when not set.
+
+        Returns:
+            None.
+
+        Raises:
+            - ValueError
+        """
+
+        if name is None:
+            name = os.environ.get("SDWC_JSON_CODEC") or self.best()
+        if name not in self.available():
+            raise ValueError(f"json codec not available: {name}")
+        self.name = name
+
+        if name == "orjson":
+            self.loads = orjson.loads
+            self.dumps = orjson.dumps
+        elif name == "ujson":
+            self.loads = ujson.loads
+            self.dumps = self.ujson_dumps
+        else:
+            self.loads = json.loads
+            self.dumps = self.json_dumps
+
+    @staticmethod
+    def available():
+        """
+        Lists the json libraries that can be used.
+
+        Returns:
+            (list(str)): names in order of preference.
+        """
+
+        installed = {"orjson": orjson, "ujson": ujson, "json": json}
+        return [name for name in CODECS if installed[name] is not None]
+
+    @classmethod
+    def best(cls):
+        """
+        Returns the name of the preferred installed library.
+
+        Returns:
+            (str): the codec name.
+        """
+
+        return cls.available()[0]
+
+    @staticmethod
+    def ujson_dumps(data):
+        """
+        Encodes data to utf-8 json bytes with ujson.
+
+        Args:
+            - data (dict): the data to encode.
+
+        Returns:
+            (bytes): the json document.
+        """
+
+        return ujson.dumps(data, ensure_ascii=False).encode()
+
+    @staticmethod
+    def json_dumps(data):
+        """
+        Encodes data to utf-8 json bytes with the standard library.
+
+        Args:
+            - data (dict): the data to encode.
+
+        Returns:
+            (bytes): the json document.
+        """
+
+        return json.dumps(
+            data, ensure_ascii=False, separators=(",", ":")
+        ).encode()
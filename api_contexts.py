@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
 import os
+from api_cache import ApiCache
+from api_trace import ApiTrace
 from api_helper import ApiHelper
 from api_authenticate import ApiAuthenticate
 
@@ -12,6 +14,7 @@ except KeyError:
     ApiHelper().print_env_error()
 
 
+@ApiTrace.traced_class
 class ApiContexts:
     """
     A class for context related api calls.
@@ -28,6 +31,7 @@ class ApiContexts:
             - session (obj): session header with access token.
             - org_id (str): the accounts org id number.
             - url (str): the url specific to this class's api endpoint.
+            - cache (obj): shared name index for this endpoint.
 
         Returns:
             None.
@@ -40,6 +44,7 @@ class ApiContexts:
             f"{SDWC_BASE_URL}/manage-accounts/{VERSION}/api/orgs/"
             f"{self.org_id}/contexts"
         )
+        self.cache = ApiCache.for_url(self.url, "contextId")
 
     def create(
         self, name,
@@ -89,7 +94,8 @@ class ApiContexts:
         response = ApiHelper().http(
             "POST", self.session, self.url, payload=context_data
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.insert(response)
         return response
 
     def delete(self, name):
@@ -106,13 +112,15 @@ class ApiContexts:
         del_headers = {
             "x-http-method-override": "DELETE"
         }
-        self.session.headers.update(del_headers)
-        context_id = self.get(name)["contextId"]
+        context_id = self.get(name, detail=False)["contextId"]
         new_url = self.url + f"/{context_id}"
         response = ApiHelper().http(
-            "POST", self.session, new_url
+            "POST", self.session, new_url, headers=del_headers,
+            idempotent=True
         )
         response = response["status"]
+        if 200 <= response < 300:
+            self.cache.evict(context_id)
         return response
 
     def get_all(self):
@@ -126,26 +134,75 @@ class ApiContexts:
         response = ApiHelper().http(
             "GET", self.session, self.url
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.update(response)
         return response
 
-    def get(self, name):
+    def iter_all(self):
+        """
+        Iterates over all contexts while the response is being read,
+        for large orgs where get_all would hold the whole collection
+        in memory.
+
+        Returns:
+            (generator(dict)): settings for each of the contexts.
+        """
+
+        yield from ApiHelper().iter_items(self.session, self.url)
+
+    def get(self, name, detail=True):
         """
         Shows configuration details for a specific context.
+        With detail set to False the entry from the collection is
+        returned without requesting the full details.
 
         Args:
             - name (str): name of the client connector.
+            - detail (bool): request the full details of the context.
 
         Returns:
             response (list(dict)): settings for a context.
         """
 
-        for context in self.get_all():
-            if context["name"] == name:
-                context_id = context["contextId"]
-                new_url = f"{self.url}/{context_id}"
-                response = ApiHelper().http(
-                    "GET", self.session, new_url
-                )
-                response = ApiHelper().parse(response["content"])
-                return response
+        context = self.cache.lookup(name, self.get_all)
+        if context is not None:
+            if not detail:
+                return dict(context)
+            context_id = context["contextId"]
+            new_url = f"{self.url}/{context_id}"
+            response = ApiHelper().http(
+                "GET", self.session, new_url
+            )
+            response = ApiHelper().parse(response)
+            return response
+
+    def get_many(self, names, detail=True):
+        """
+        Shows configuration details for several contexts. The collection
+        is loaded at most once and the details are fetched concurrently.
+
+        Args:
+            - names (list(str)): names of the contexts.
+            - detail (bool): request the full details, otherwise the
+              collection entries are returned.
+
+        Returns:
+            response (dict): settings per name, None if not found.
+        """
+
+        contexts = self.cache.lookup_many(names, self.get_all)
+        if not detail:
+            return {
+                name: None if context is None else dict(context)
+                for name, context in contexts.items()
+            }
+
+        urls = {
+            name: f"{self.url}/{context['contextId']}"
+            for name, context in contexts.items() if context is not None
+        }
+        details = ApiHelper().http_many("GET", self.session, urls)
+        response = dict.fromkeys(names)
+        for name, entry in details.items():
+            response[name] = ApiHelper().parse(entry)
+        return response
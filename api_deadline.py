@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+import re
+import time
+import contextvars
+
+CURRENT_DEADLINE = contextvars.ContextVar("sdwc_deadline", default=None)
+UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class ApiDeadlineExceeded(Exception):
+    """
+    Raised when an api call is attempted after the deadline passed.
+    """
+
+
+class ApiDeadline:
+    """
+    A class for an end-to-end time budget. While a deadline is active,
+    every api call made in the same context, including calls on other
+    threads started with that context, gets only the remaining time.
+    """
+
+    def __init__(self, seconds):
+        """
+        Initializes the deadline relative to now.
+
+        Args:
+            - seconds (float): the time budget.
+
+        Returns:
+            None.
+        """
+
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self.token = None
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Creates a deadline from a duration such as 30s, 500ms, 2m or 1h.
+        A plain number is read as seconds.
+
+        Args:
+            - text (str): the duration.
+
+        Returns:
+            (ApiDeadline): the new deadline.
+
+        Raises:
+            - ValueError
+        """
+
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*", text)
+        if match is None:
+            raise ValueError(f"invalid duration: {text}")
+        value, unit = match.groups()
+        return cls(float(value) * UNITS[unit or "s"])
+
+    @staticmethod
+    def current():
+        """
+        Returns the deadline active in this context.
+
+        Returns:
+            (ApiDeadline): the active deadline or None.
+        """
+
+        return CURRENT_DEADLINE.get()
+
+    def remaining(self):
+        """
+        Returns the seconds left, never less than zero.
+
+        Returns:
+            (float): remaining seconds.
+        """
+
+        return max(self.expires - time.monotonic(), 0.0)
+
+    def check(self):
+        """
+        Stops the current work if the deadline has passed.
+
+        Returns:
+            None.
+
+        Raises:
+            - ApiDeadlineExceeded
+        """
+
+        if self.remaining() <= 0:
+            raise ApiDeadlineExceeded(
+                f"deadline of {self.seconds:g}s exceeded"
+            )
+
+    def __enter__(self):
+        self.token = CURRENT_DEADLINE.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        CURRENT_DEADLINE.reset(self.token)
+        self.token = None
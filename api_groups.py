@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
 import os
+from api_cache import ApiCache
+from api_trace import ApiTrace
 from api_helper import ApiHelper
 from api_authenticate import ApiAuthenticate
 
@@ -12,6 +14,7 @@ except KeyError:
     ApiHelper().print_env_error()
 
 
+@ApiTrace.traced_class
 class ApiGroups:
     """
     A class for group related api calls.
@@ -28,6 +31,7 @@ class ApiGroups:
             - session (obj): session header with access token.
             - org_id (str): the accounts org id number.
             - url (str): the url specific to this class's api endpoint.
+            - cache (obj): shared name index for this endpoint.
 
         Returns:
             None.
@@ -40,6 +44,7 @@ class ApiGroups:
             f"{SDWC_BASE_URL}/manage-accounts/{VERSION}/api/orgs/"
             f"{self.org_id}/groups"
         )
+        self.cache = ApiCache.for_url(self.url, "groupId")
 
     def create(self, name, description="created by api user"):
         """
@@ -61,7 +66,8 @@ class ApiGroups:
         group = ApiHelper().http(
             "POST", self.session, self.url, payload=group_data
         )
-        group = ApiHelper().parse(group["content"])
+        group = ApiHelper().parse(group)
+        self.cache.insert(group)
         return group
 
     def delete(self, name):
@@ -78,11 +84,16 @@ class ApiGroups:
         del_headers = {
             "x-http-method-override": "DELETE"
         }
-        self.session.headers.update(del_headers)
-        group_id = self.get(name)["groupId"]
-        delete_url = self.url + f"/{group_id}"
-        request = self.session.post(delete_url, headers=del_headers)
-        return request.status_code
+        group_id = self.get(name, detail=False)["groupId"]
+        new_url = self.url + f"/{group_id}"
+        response = ApiHelper().http(
+            "POST", self.session, new_url, headers=del_headers,
+            idempotent=True
+        )
+        response = response["status"]
+        if 200 <= response < 300:
+            self.cache.evict(group_id)
+        return response
 
     def get_members(self, name):
         """
@@ -95,12 +106,35 @@ class ApiGroups:
             response (list(dict)): node details.
         """
 
-        group_id = self.get(name)["groupId"]
+        group_id = self.get(name, detail=False)["groupId"]
         new_url = f"{self.url}/{group_id}/users"
         response = ApiHelper().http(
             "GET", self.session, new_url
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        return response
+
+    def get_members_many(self, names):
+        """
+        Finds nodes assigned to several groups. The collection is loaded
+        at most once and the members are fetched concurrently.
+
+        Args:
+            - names (list(str)): names of the groups.
+
+        Returns:
+            response (dict): node details per name, None if not found.
+        """
+
+        groups = self.cache.lookup_many(names, self.get_all)
+        urls = {
+            name: f"{self.url}/{group['groupId']}/users"
+            for name, group in groups.items() if group is not None
+        }
+        members = ApiHelper().http_many("GET", self.session, urls)
+        response = dict.fromkeys(names)
+        for name, entry in members.items():
+            response[name] = ApiHelper().parse(entry)
         return response
 
     def get_all(self):
@@ -114,26 +148,75 @@ class ApiGroups:
         response = ApiHelper().http(
             "GET", self.session, self.url
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.update(response)
         return response
 
-    def get(self, name):
+    def iter_all(self):
+        """
+        Iterates over all groups while the response is being read,
+        for large orgs where get_all would hold the whole collection
+        in memory.
+
+        Returns:
+            (generator(dict)): settings for each of the groups.
+        """
+
+        yield from ApiHelper().iter_items(self.session, self.url)
+
+    def get(self, name, detail=True):
         """
         Shows configuration details for a specific group.
+        With detail set to False the entry from the collection is
+        returned without requesting the full details.
 
         Args:
             - name (str): name of the group.
+            - detail (bool): request the full details of the group.
 
         Returns:
             response (list(dict)): settings for a group.
         """
 
-        for group in self.get_all():
-            if group["name"] == name:
-                group_id = group["groupId"]
-                new_url = f"{self.url}/{group_id}"
-                response = ApiHelper().http(
-                    "GET", self.session, new_url
-                )
-                response = ApiHelper().parse(response["content"])
-                return response
+        group = self.cache.lookup(name, self.get_all)
+        if group is not None:
+            if not detail:
+                return dict(group)
+            group_id = group["groupId"]
+            new_url = f"{self.url}/{group_id}"
+            response = ApiHelper().http(
+                "GET", self.session, new_url
+            )
+            response = ApiHelper().parse(response)
+            return response
+
+    def get_many(self, names, detail=True):
+        """
+        Shows configuration details for several groups. The collection
+        is loaded at most once and the details are fetched concurrently.
+
+        Args:
+            - names (list(str)): names of the groups.
+            - detail (bool): request the full details, otherwise the
+              collection entries are returned.
+
+        Returns:
+            response (dict): settings per name, None if not found.
+        """
+
+        groups = self.cache.lookup_many(names, self.get_all)
+        if not detail:
+            return {
+                name: None if group is None else dict(group)
+                for name, group in groups.items()
+            }
+
+        urls = {
+            name: f"{self.url}/{group['groupId']}"
+            for name, group in groups.items() if group is not None
+        }
+        details = ApiHelper().http_many("GET", self.session, urls)
+        response = dict.fromkeys(names)
+        for name, entry in details.items():
+            response[name] = ApiHelper().parse(entry)
+        return response
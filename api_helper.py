@@ -2,48 +2,196 @@
 
 import sys
 import json
+import time
+import codecs
+import functools
+import threading
+import contextvars
+import collections
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from api_codec import ApiCodec
+from api_trace import ApiTrace
+from api_retry import ApiRetry
+from api_metrics import ApiMetrics
+from api_transport import ApiTransport
+from api_rate_limit import ApiRateLimiter
+from api_single_flight import ApiSingleFlight
+from api_response_cache import ApiResponseCache
+from api_deadline import ApiDeadline, ApiDeadlineExceeded
 
 
-class ApiHelper:
+class ApiResponse:
     """
-    A class for assisting other api libraries.
+    An immutable result of a single http call. Each call gets its own
+    response object so results can be passed between threads safely.
     """
 
-    def __init__(self):
+    __slots__ = ("status", "headers", "content", "elapsed", "_json")
+
+    def __init__(self, status, headers, content, elapsed):
         """
-        Initializes a dictionary for response data.
+        Initializes the response with the data read from the wire.
 
         Args:
-            - http_resp_dict (dict): status, headers, content.
+            - status (int): http status code.
+            - headers (dict): http response headers.
+            - content (bytes): raw response body.
+            - elapsed (float): seconds taken by the call.
 
         Returns:
             None.
         """
 
-        self.http_resp_dict = {
-            "status": "",
-            "headers": "",
-            "content": ""
-        }
+        object.__setattr__(self, "status", status)
+        object.__setattr__(self, "headers", headers)
+        object.__setattr__(self, "content", content)
+        object.__setattr__(self, "elapsed", elapsed)
+        object.__setattr__(self, "_json", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ApiResponse is immutable")
+
+    def copy(self):
+        """
+        Creates a response with the same data that decodes its body
+        again, so callers sharing a call do not share decoded objects.
 
-    def http(self, method, session, url, payload=None):
+        Returns:
+            (ApiResponse): the new response.
+        """
+
+        return ApiResponse(
+            self.status, self.headers.copy(), self.content, self.elapsed
+        )
+
+    def __getitem__(self, key):
         """
-        Makes the http call to the api and parses the responses.
+        Allows dictionary style access for status, headers, content
+        and elapsed.
+
+        Args:
+            - key (str): the field name.
+
+        Returns:
+            the value of the field.
+        """
+
+        if key not in ("status", "headers", "content", "elapsed"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def json(self):
+        """
+        Decodes the body on first use and keeps the result.
+
+        Returns:
+            data (dict): structured data.
+        """
+
+        if self._json is None:
+            object.__setattr__(self, "_json", ApiHelper().parse(self.content))
+        return self._json
+
+
+class ApiHelper:
+    """
+    A class for assisting other api libraries. The helper keeps no
+    per-call state, so a single instance is shared by all threads.
+    """
+
+    instance = None
+    instance_lock = threading.Lock()
+
+    def __new__(cls):
+        """
+        Returns the process-wide helper, creating it on first use.
+
+        Returns:
+            (ApiHelper): the shared helper.
+        """
+
+        if cls.instance is None:
+            with cls.instance_lock:
+                if cls.instance is None:
+                    instance = super().__new__(cls)
+                    instance.initialize()
+                    cls.instance = instance
+        return cls.instance
+
+    def initialize(self):
+        """
+        Sets up the state shared by all calls: the json codec, the
+        transport settings, the default retry policy, the retry
+        counters, the rate limiter, the response cache, the table
+        of in-flight GETs, the transfer counters and the per endpoint
+        metrics.
+
+        Returns:
+            None.
+        """
+
+        self.codec = ApiCodec()
+        self.transport = ApiTransport()
+        self.retry_policy = ApiRetry()
+        self.rate_limiter = ApiRateLimiter()
+        self.response_cache = ApiResponseCache()
+        self.single_flight = ApiSingleFlight()
+        self.transfers = collections.Counter()
+        self.transfers_lock = threading.Lock()
+        self.metrics = ApiMetrics()
+        self.retries = collections.Counter()
+        self.retries_lock = threading.Lock()
+
+    def http(
+        self, method, session, url, payload=None, headers=None,
+        retry=None, idempotent=None, timeout=None
+    ):
+        """
+        Makes the http call to the api and parses the responses. Calls
+        that fail with a connection error, a timeout or a retryable
+        status such as 429 or 503 are sent again according to the
+        retry policy. Every try waits for the shared rate limiter.
+
+        Concurrent GETs of the same url on the same session share one
+        call, each caller getting its own copy of the response.
+
+        While ApiTrace is enabled the call, including its retries, is
+        recorded as a span named after the method and endpoint.
+
+        GET responses carrying an ETag or Last-Modified header are kept
+        per url. Later GETs of the url send If-None-Match or
+        If-Modified-Since, and a 304 answer returns a new response
+        built from the kept body, decoded again for each caller.
+
+        Each try has connect and read timeouts. When an ApiDeadline is
+        active they are shortened to the remaining time, no retry is
+        scheduled past it and ApiDeadlineExceeded is raised once it
+        has passed.
 
         Args:
             - method (str): http method such as GET or POST.
             - session (obj): requests library session object.
             - url (str): specified api endpoint.
             - payload (dict): configuration parameters.
+            - headers (dict): extra headers for this call only, the
+              shared session headers are left untouched.
+            - retry (ApiRetry): policy for this call only, False
+              disables retries, None uses the default policy.
+            - idempotent (bool): whether sending the call twice is
+              safe, defaults to True for GET and False for POST.
+            - timeout (tuple(float)): connect and read timeouts for this
+              call only, None uses the transport settings.
 
         Returns:
-            http_resp_dict (dict):
-                - status (str): http status code for verification.
+            response (ApiResponse):
+                - status (int): http status code for verification.
                 - headers (dict): http response headers for troubleshooting.
-                - content (dict): configuration details.
+                - content (bytes): configuration details.
+                - elapsed (float): seconds taken by the call.
 
         Raises:
+            - ApiDeadlineExceeded
             - requests.exceptions.ConnectionError
             - requests.exceptions.HTTPError
             - requests.exceptions.URLRequired
@@ -52,32 +200,466 @@ class ApiHelper:
             - requests.exceptions.RequestException
         """
 
-        try:
+        if method not in ("GET", "POST"):
+            return None
 
-            if method == "GET":
-                response = session.get(url)
-                self.http_resp_dict["status"] = response.status_code
-                self.http_resp_dict["headers"] = response.headers
-                self.http_resp_dict["content"] = response.content
-                return self.http_resp_dict
-            elif method == "POST":
-                response = session.post(url, json=payload)
-                self.http_resp_dict["status"] = response.status_code
-                self.http_resp_dict["headers"] = response.headers
-                self.http_resp_dict["content"] = response.content
-                return self.http_resp_dict
-        except requests.exceptions.ConnectionError as e:
-            raise Exception(e)
-        except requests.exceptions.HTTPError as e:
-            raise Exception(e)
-        except requests.exceptions.URLRequired as e:
-            raise Exception(e)
-        except requests.exceptions.TooManyRedirects as e:
-            raise Exception(e)
-        except requests.exceptions.Timeout as e:
-            raise Exception(e)
-        except requests.exceptions.RequestException as e:
-            raise Exception(e)
+        call = functools.partial(
+            self.call, method, session, url, payload=payload,
+            headers=headers, retry=retry, idempotent=idempotent,
+            timeout=timeout
+        )
+        if method == "GET":
+            key = (id(session), url, frozenset((headers or {}).items()))
+            call = functools.partial(self.call_shared, key, call)
+
+        if not ApiTrace.enabled:
+            return call()
+        name = f"{method} {ApiMetrics.template(url)}"
+        with ApiTrace.span(name, url=url) as span:
+            response = call()
+            span.attrs["status"] = response.status
+            return response
+
+    def call_shared(self, key, call):
+        """
+        Runs a GET through the single flight group. Every caller gets
+        its own copy of the shared response.
+
+        Args:
+            - key (tuple): identifies identical calls.
+            - call (callable): makes the call.
+
+        Returns:
+            response (ApiResponse): the response of the call.
+        """
+
+        return self.single_flight.do(key, call).copy()
+
+    def call(
+        self, method, session, url, payload=None, headers=None,
+        retry=None, idempotent=None, timeout=None
+    ):
+        """
+        Sends one http call with retries, see http for the arguments.
+
+        Returns:
+            response (ApiResponse): the response of the call.
+        """
+
+        policy = self.retry_policy if retry is None else retry
+        if idempotent is None:
+            idempotent = method == "GET"
+        deadline = ApiDeadline.current()
+
+        data = None
+        if payload is not None:
+            data = self.codec.dumps(payload)
+            headers = {"Content-Type": "application/json", **(headers or {})}
+
+        cached = None
+        if method == "GET":
+            cached = self.response_cache.get(url)
+        if cached is not None:
+            validators = self.response_cache.validators(cached[0])
+            headers = {**validators, **(headers or {})}
+
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            response = None
+            error = None
+            self.rate_limiter.acquire()
+            if deadline is not None:
+                deadline.check()
+            call_timeout = timeout or self.transport.timeout(deadline)
+            start = time.perf_counter()
+            try:
+                if method == "GET":
+                    response = session.get(
+                        url, headers=headers, timeout=call_timeout
+                    )
+                else:
+                    response = session.post(
+                        url, data=data, headers=headers,
+                        timeout=call_timeout
+                    )
+            except requests.exceptions.ConnectionError as e:
+                error = e
+            except requests.exceptions.Timeout as e:
+                error = e
+            except requests.exceptions.RequestException as e:
+                self.metrics.record(
+                    method, url, "error", time.perf_counter() - start
+                )
+                raise Exception(e)
+
+            if error is not None:
+                self.metrics.record(
+                    method, url, "error", time.perf_counter() - start
+                )
+            if error is not None and deadline is not None:
+                try:
+                    deadline.check()
+                except ApiDeadlineExceeded as e:
+                    raise e from error
+
+            delay = None
+            if policy:
+                delay = policy.backoff(
+                    attempt, started, idempotent,
+                    response=response, error=error
+                )
+            if delay is not None and deadline is not None:
+                if delay >= deadline.remaining():
+                    delay = None
+
+            if delay is None:
+                if error is not None:
+                    raise Exception(error)
+                content = response.content
+                elapsed = time.perf_counter() - start
+                wire = self.count_transfer(response, len(content))
+                self.metrics.record(
+                    method, url, response.status_code, elapsed,
+                    wire=wire, decoded=len(content)
+                )
+                if cached is not None and response.status_code == 304:
+                    self.response_cache.count("hits")
+                    cached_headers, cached_content = cached
+                    return ApiResponse(
+                        200, cached_headers.copy(), cached_content, elapsed
+                    )
+                result = ApiResponse(
+                    response.status_code, response.headers, content, elapsed
+                )
+                if method == "GET":
+                    self.response_cache.count("misses")
+                    self.response_cache.store(url, result)
+                return result
+
+            if response is not None:
+                response.close()
+                self.metrics.record(
+                    method, url, response.status_code,
+                    time.perf_counter() - start
+                )
+                self.count_retry(f"status_{response.status_code}")
+            else:
+                self.count_retry(type(error).__name__)
+            time.sleep(delay)
+            attempt += 1
+
+    def http_many(self, method, session, urls, **kwargs):
+        """
+        Makes several http calls concurrently, using at most as many
+        threads as the connection pool has connections. Each call runs
+        in a copy of the caller's context, so an active deadline
+        applies to all of them.
+
+        Args:
+            - method (str): http method such as GET or POST.
+            - session (obj): requests library session object.
+            - urls (dict): api endpoint per caller chosen key.
+            - kwargs (dict): further arguments for http.
+
+        Returns:
+            responses (dict): ApiResponse per key.
+        """
+
+        if not urls:
+            return {}
+
+        workers = min(len(urls), self.transport.pool_maxsize)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                key: executor.submit(
+                    contextvars.copy_context().run,
+                    self.http, method, session, url, **kwargs
+                )
+                for key, url in urls.items()
+            }
+            return {key: future.result() for key, future in futures.items()}
+
+    def iter_items(self, session, url, chunk_size=65536):
+        """
+        Iterates over the objects of a collection endpoint while the
+        response is being read, so memory stays bounded by the largest
+        object instead of the whole collection. Compressed bodies are
+        decompressed chunk by chunk on the way into the json decoder.
+        Pages announced with a Link rel="next" header are followed.
+
+        Args:
+            - session (obj): requests library session object.
+            - url (str): specified api endpoint.
+            - chunk_size (int): bytes read from the socket at a time.
+
+        Returns:
+            (generator(dict)): the objects in server order.
+
+        Raises:
+            - requests.exceptions.RequestException
+            - Exception: the body is not valid json.
+        """
+
+        deadline = ApiDeadline.current()
+        while url:
+            self.rate_limiter.acquire()
+            if deadline is not None:
+                deadline.check()
+            start = time.perf_counter()
+            try:
+                response = session.get(
+                    url, stream=True, timeout=self.transport.timeout(deadline)
+                )
+            except requests.exceptions.RequestException as e:
+                self.metrics.record(
+                    "GET", url, "error", time.perf_counter() - start
+                )
+                raise Exception(e)
+
+            with response:
+                if response.status_code >= 400:
+                    self.metrics.record(
+                        "GET", url, response.status_code,
+                        time.perf_counter() - start
+                    )
+                    raise Exception(
+                        f"{response.status_code} {response.reason} for {url}"
+                    )
+                decoded = [0]
+                chunks = self.count_chunks(
+                    response.iter_content(chunk_size), decoded
+                )
+                yield from self.stream_decode(chunks)
+                wire = self.count_transfer(response, decoded[0])
+                self.metrics.record(
+                    "GET", url, response.status_code,
+                    time.perf_counter() - start,
+                    wire=wire, decoded=decoded[0]
+                )
+                url = response.links.get("next", {}).get("url")
+
+    def stream_decode(self, chunks):
+        """
+        Decodes a json array from a stream of byte chunks, producing
+        each element as soon as it is complete. A body that is not an
+        array is decoded as a whole. Elements must be separated by one
+        comma each and nothing but whitespace may follow the array.
+
+        Args:
+            - chunks (iterable(bytes)): the response body.
+
+        Returns:
+            (generator(dict)): the decoded elements.
+
+        Raises:
+            - Exception: the body is not valid json.
+        """
+
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        chunks = iter(chunks)
+        whitespace = " \t\r\n"
+        buffer = ""
+        pos = 0
+        eof = False
+        state = "start"
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in whitespace:
+                pos += 1
+
+            if pos < len(buffer):
+                char = buffer[pos]
+
+                if state == "start":
+                    if char != "[":
+                        rest = buffer[pos:] + "".join(
+                            text.decode(chunk) for chunk in chunks
+                        ) + text.decode(b"", final=True)
+                        data = self.parse(rest)
+                        if isinstance(data, list):
+                            yield from data
+                        else:
+                            yield data
+                        return
+                    state = "first"
+                    pos += 1
+                    continue
+
+                if state == "done":
+                    raise Exception("unexpected data after json array")
+
+                if state == "separator":
+                    if char == ",":
+                        state = "element"
+                    elif char == "]":
+                        state = "done"
+                    else:
+                        raise Exception(
+                            f"expected , or ] in json array, got {char!r}"
+                        )
+                    pos += 1
+                    continue
+
+                if state == "first" and char == "]":
+                    state = "done"
+                    pos += 1
+                    continue
+
+                # an element is only complete once something follows it,
+                # a number such as 1.5e3 may continue in the next chunk
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except ValueError as e:
+                    if eof:
+                        raise Exception(e)
+                else:
+                    after = end
+                    if type(item) in (int, float):
+                        while (
+                            after < len(buffer)
+                            and buffer[after] in "0123456789.eE+-"
+                        ):
+                            after += 1
+                    while after < len(buffer) and buffer[after] in whitespace:
+                        after += 1
+                    if after < len(buffer) or eof:
+                        yield item
+                        pos = end
+                        state = "separator"
+                        continue
+            elif eof:
+                if state not in ("start", "done"):
+                    raise Exception("truncated json array")
+                return
+
+            chunk = next(chunks, None)
+            if chunk is None:
+                eof = True
+                buffer = buffer[pos:] + text.decode(b"", final=True)
+            else:
+                buffer = buffer[pos:] + text.decode(chunk)
+            pos = 0
+
+    def cache_stats(self):
+        """
+        Shows how often conditional GETs reused a cached response.
+
+        Returns:
+            stats (dict): hits, misses and the number of cached urls.
+        """
+
+        return self.response_cache.stats()
+
+    def single_flight_stats(self):
+        """
+        Shows how many GETs were answered by another caller's call.
+
+        Returns:
+            stats (dict): calls made and calls shared.
+        """
+
+        return self.single_flight.stats()
+
+    def count_chunks(self, chunks, decoded):
+        """
+        Passes chunks through while adding up their size.
+
+        Args:
+            - chunks (iterable(bytes)): decoded response body chunks.
+            - decoded (list(int)): one element holding the running total.
+
+        Returns:
+            (generator(bytes)): the same chunks.
+        """
+
+        for chunk in chunks:
+            decoded[0] += len(chunk)
+            yield chunk
+
+    def count_transfer(self, response, decoded):
+        """
+        Records the body size on the wire and after decompression.
+
+        Args:
+            - response (obj): requests library response object.
+            - decoded (int): size of the decoded body in bytes.
+
+        Returns:
+            wire (int): size of the body on the wire in bytes.
+        """
+
+        wire = decoded
+        if hasattr(response.raw, "tell"):
+            wire = response.raw.tell()
+        encoding = response.headers.get("Content-Encoding") or "identity"
+        with self.transfers_lock:
+            self.transfers["responses"] += 1
+            self.transfers["wire_bytes"] += wire
+            self.transfers["decoded_bytes"] += decoded
+            self.transfers[f"encoding_{encoding.lower()}"] += 1
+        return wire
+
+    def transfer_stats(self):
+        """
+        Shows how many bytes were received and how much compression
+        saved.
+
+        Returns:
+            stats (dict): responses, wire_bytes, decoded_bytes and the
+            number of responses per content encoding.
+        """
+
+        with self.transfers_lock:
+            return dict(self.transfers)
+
+    def stats(self):
+        """
+        Collects all instrumentation of the http layer.
+
+        Returns:
+            stats (dict):
+                - endpoints (list(dict)): per endpoint metrics.
+                - retries (dict): see retry_stats.
+                - cache (dict): see cache_stats.
+                - single_flight (dict): see single_flight_stats.
+                - transfers (dict): see transfer_stats.
+        """
+
+        return {
+            "endpoints": self.metrics.snapshot(),
+            "retries": self.retry_stats(),
+            "cache": self.cache_stats(),
+            "single_flight": self.single_flight_stats(),
+            "transfers": self.transfer_stats(),
+        }
+
+    def count_retry(self, reason):
+        """
+        Records a retry in the shared counters.
+
+        Args:
+            - reason (str): the status code or exception name.
+
+        Returns:
+            None.
+        """
+
+        with self.retries_lock:
+            self.retries["retries"] += 1
+            self.retries[reason] += 1
+
+    def retry_stats(self):
+        """
+        Shows how many calls were retried since the process started.
+
+        Returns:
+            stats (dict): total retries and retries per reason.
+        """
+
+        with self.retries_lock:
+            return dict(self.retries)
 
     def print_env_error(self):
         """
@@ -98,7 +680,11 @@ class ApiHelper:
 
     def parse(self, data):
         """
-        A simple parser for handling and structuring data.
+        A simple parser for handling and structuring data. Bytes are
+        decoded directly with the configured json codec.
+
+        Args:
+            - data (dict, bytes, ApiResponse): data to structure.
 
         Returns:
             data(dict): structured data.
@@ -111,8 +697,10 @@ class ApiHelper:
         try:
             if isinstance(data, dict):
                 return data
+            elif isinstance(data, ApiResponse):
+                return data.json()
             else:
-                data = json.loads(data)
+                data = self.codec.loads(data)
                 return data
         except json.decoder.JSONDecodeError as e:
             raise Exception(e)
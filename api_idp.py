@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
 import os
+from api_users import ApiUsers
+from api_trace import ApiTrace
 from api_helper import ApiHelper
 from api_authenticate import ApiAuthenticate
 
@@ -12,6 +14,7 @@ except KeyError:
     ApiHelper().print_env_error()
 
 
+@ApiTrace.traced_class
 class ApiIdp:
     """
     A class for user identity related api calls.
@@ -43,7 +46,8 @@ class ApiIdp:
 
     def create(self, role_type, email, name):
         """
-        Used in the creation of groups.
+        Used in the creation of users. The cached user index is dropped
+        so the invited user can be found by name.
 
         Args:
             - role_type (str): assigned privileges.
@@ -63,7 +67,8 @@ class ApiIdp:
             "POST", self.session, new_url, payload=user_data
         )
 
-        response = ApiHelper().parse(response)
         response = response["status"]
+        if 200 <= response < 300:
+            ApiUsers().cache.invalidate()
 
         return response
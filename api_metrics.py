@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+
+import bisect
+import threading
+import urllib.parse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PLACEHOLDERS = {
+    "orgs": "{org}",
+    "users": "{id}",
+    "groups": "{id}",
+    "rules": "{id}",
+    "contexts": "{id}",
+    "v2lans": "{id}",
+    "servers": "{id}",
+    "gateways": "{id}",
+    "roles": "{role}",
+    "emails": "{email}",
+}
+
+
+class ApiMetrics:
+    """
+    A class for recording call counts, status codes, bytes and latency
+    per http method and endpoint template.
+    """
+
+    def __init__(self):
+        """
+        Initializes empty metrics.
+
+        Returns:
+            None.
+        """
+
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def template(url):
+        """
+        Turns a url into its endpoint template by replacing org ids,
+        object ids, roles and emails with placeholders, e.g.
+        /manage-accounts/v1.1/api/orgs/{org}/groups/{id}/users.
+
+        Args:
+            - url (str): specified api endpoint.
+
+        Returns:
+            (str): the endpoint template.
+        """
+
+        segments = urllib.parse.urlsplit(url).path.split("/")
+        for i in range(1, len(segments)):
+            placeholder = PLACEHOLDERS.get(segments[i - 1])
+            if placeholder is not None and segments[i]:
+                segments[i] = placeholder
+        return "/".join(segments)
+
+    def record(self, method, url, status, seconds, wire=0, decoded=0):
+        """
+        Records one http call.
+
+        Args:
+            - method (str): http method such as GET or POST.
+            - url (str): specified api endpoint.
+            - status (int): http status code, or error for failed calls.
+            - seconds (float): time taken by the call.
+            - wire (int): body bytes received on the wire.
+            - decoded (int): body bytes after decompression.
+
+        Returns:
+            None.
+        """
+
+        key = (method, self.template(url))
+        bucket = bisect.bisect_left(BUCKETS, seconds)
+        with self.lock:
+            entry = self.endpoints.get(key)
+            if entry is None:
+                entry = {
+                    "calls": 0,
+                    "statuses": {},
+                    "wire_bytes": 0,
+                    "decoded_bytes": 0,
+                    "seconds": 0.0,
+                    "buckets": [0] * (len(BUCKETS) + 1),
+                }
+                self.endpoints[key] = entry
+            entry["calls"] += 1
+            status = str(status)
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["wire_bytes"] += wire
+            entry["decoded_bytes"] += decoded
+            entry["seconds"] += seconds
+            entry["buckets"][bucket] += 1
+
+    def snapshot(self):
+        """
+        Shows the metrics recorded so far.
+
+        Returns:
+            metrics (list(dict)): one entry per method and endpoint with
+            calls, statuses, bytes, total seconds and a latency
+            histogram keyed by upper bound in seconds.
+        """
+
+        bounds = [str(bound) for bound in BUCKETS] + ["+Inf"]
+        with self.lock:
+            items = sorted(self.endpoints.items())
+            return [
+                {
+                    "method": method,
+                    "endpoint": endpoint,
+                    "calls": entry["calls"],
+                    "statuses": dict(entry["statuses"]),
+                    "wire_bytes": entry["wire_bytes"],
+                    "decoded_bytes": entry["decoded_bytes"],
+                    "seconds": entry["seconds"],
+                    "histogram": dict(zip(bounds, entry["buckets"])),
+                }
+                for (method, endpoint), entry in items
+            ]
+
+    @staticmethod
+    def escape(value):
+        """
+        Escapes a label value for the Prometheus text format.
+
+        Args:
+            - value (str): the label value.
+
+        Returns:
+            (str): the escaped value.
+        """
+
+        return (
+            str(value).replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n")
+        )
+
+    def to_prometheus(self):
+        """
+        Formats the metrics in the Prometheus text exposition format,
+        each metric family as one group after its HELP and TYPE lines.
+
+        Returns:
+            (str): the metrics text.
+        """
+
+        entries = self.snapshot()
+        for entry in entries:
+            entry["labels"] = (
+                f'method="{self.escape(entry["method"])}",'
+                f'endpoint="{self.escape(entry["endpoint"])}"'
+            )
+
+        lines = [
+            "# HELP sdwc_http_requests_total Http calls by status code.",
+            "# TYPE sdwc_http_requests_total counter",
+        ]
+        for entry in entries:
+            for status, count in sorted(entry["statuses"].items()):
+                lines.append(
+                    f"sdwc_http_requests_total{{{entry['labels']},"
+                    f'status="{self.escape(status)}"}} {count}'
+                )
+
+        lines += [
+            "# HELP sdwc_http_response_bytes_total Response body bytes.",
+            "# TYPE sdwc_http_response_bytes_total counter",
+        ]
+        for entry in entries:
+            for kind in ("wire", "decoded"):
+                lines.append(
+                    f"sdwc_http_response_bytes_total{{{entry['labels']},"
+                    f'kind="{kind}"}} {entry[kind + "_bytes"]}'
+                )
+
+        lines += [
+            "# HELP sdwc_http_request_duration_seconds Http call latency.",
+            "# TYPE sdwc_http_request_duration_seconds histogram",
+        ]
+        for entry in entries:
+            labels = entry["labels"]
+            cumulative = 0
+            for bound, count in entry["histogram"].items():
+                cumulative += count
+                lines.append(
+                    "sdwc_http_request_duration_seconds_bucket"
+                    f'{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f"sdwc_http_request_duration_seconds_sum{{{labels}}}"
+                f" {entry['seconds']}"
+            )
+            lines.append(
+                f"sdwc_http_request_duration_seconds_count{{{labels}}}"
+                f" {entry['calls']}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Drops all recorded metrics.
+
+        Returns:
+            None.
+        """
+
+        with self.lock:
+            self.endpoints = {}
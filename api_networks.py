@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
 import os
+from api_cache import ApiCache
+from api_trace import ApiTrace
 from api_helper import ApiHelper
 from api_authenticate import ApiAuthenticate
 
@@ -12,6 +14,7 @@ except KeyError:
     ApiHelper().print_env_error()
 
 
+@ApiTrace.traced_class
 class ApiNetworks:
     """
     A class for network related api calls.
@@ -28,6 +31,7 @@ class ApiNetworks:
             - session (obj): session header with access token.
             - org_id (str): the accounts org id number.
             - url (str): the url specific to this class's api endpoint.
+            - cache (obj): shared name index for this endpoint.
 
         Returns:
             None.
@@ -40,6 +44,7 @@ class ApiNetworks:
             f"{SDWC_BASE_URL}/manage-accounts/{VERSION}/api/orgs/"
             f"{self.org_id}/v2lans"
         )
+        self.cache = ApiCache.for_url(self.url, "v2lanId")
 
     def create_hub_spoke(
         self, name, source_ids, destination_ids,
@@ -101,7 +106,8 @@ class ApiNetworks:
         response = ApiHelper().http(
             "POST", self.session, self.url, payload=v2lan_data
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.insert(response)
 
         return response
 
@@ -150,7 +156,8 @@ class ApiNetworks:
         response = ApiHelper().http(
             "POST", self.session, self.url, payload=v2lan_data
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.insert(response)
 
         return response
 
@@ -168,13 +175,15 @@ class ApiNetworks:
         del_headers = {
             "x-http-method-override": "DELETE"
         }
-        self.session.headers.update(del_headers)
-        v2lan_id = self.get(name)["v2lanId"]
+        v2lan_id = self.get(name, detail=False)["v2lanId"]
         new_url = f"{self.url}/{v2lan_id}"
         response = ApiHelper().http(
-            "POST", self.session, new_url
+            "POST", self.session, new_url, headers=del_headers,
+            idempotent=True
         )
         response = response["status"]
+        if 200 <= response < 300:
+            self.cache.evict(v2lan_id)
         return response
 
     def get_all(self):
@@ -188,26 +197,75 @@ class ApiNetworks:
         response = ApiHelper().http(
             "GET", self.session, self.url
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.update(response)
         return response
 
-    def get(self, name):
+    def iter_all(self):
+        """
+        Iterates over all networks while the response is being read,
+        for large orgs where get_all would hold the whole collection
+        in memory.
+
+        Returns:
+            (generator(dict)): settings for each of the networks.
+        """
+
+        yield from ApiHelper().iter_items(self.session, self.url)
+
+    def get(self, name, detail=True):
         """
         Shows configuration details for a specific network.
+        With detail set to False the entry from the collection is
+        returned without requesting the full details.
 
         Args:
             - name (str): name of the network.
+            - detail (bool): request the full details of the network.
 
         Returns:
             response (list(dict)): settings for a network.
         """
 
-        for v2lan in self.get_all():
-            if v2lan["name"] == name:
-                v2lan_id = v2lan["v2lanId"]
-                new_url = f"{self.url}/{v2lan_id}"
-                response = ApiHelper().http(
-                    "GET", self.session, new_url
-                )
-                response = ApiHelper().parse(response["content"])
-                return response
+        v2lan = self.cache.lookup(name, self.get_all)
+        if v2lan is not None:
+            if not detail:
+                return dict(v2lan)
+            v2lan_id = v2lan["v2lanId"]
+            new_url = f"{self.url}/{v2lan_id}"
+            response = ApiHelper().http(
+                "GET", self.session, new_url
+            )
+            response = ApiHelper().parse(response)
+            return response
+
+    def get_many(self, names, detail=True):
+        """
+        Shows configuration details for several networks. The collection
+        is loaded at most once and the details are fetched concurrently.
+
+        Args:
+            - names (list(str)): names of the networks.
+            - detail (bool): request the full details, otherwise the
+              collection entries are returned.
+
+        Returns:
+            response (dict): settings per name, None if not found.
+        """
+
+        networks = self.cache.lookup_many(names, self.get_all)
+        if not detail:
+            return {
+                name: None if v2lan is None else dict(v2lan)
+                for name, v2lan in networks.items()
+            }
+
+        urls = {
+            name: f"{self.url}/{v2lan['v2lanId']}"
+            for name, v2lan in networks.items() if v2lan is not None
+        }
+        details = ApiHelper().http_many("GET", self.session, urls)
+        response = dict.fromkeys(names)
+        for name, entry in details.items():
+            response[name] = ApiHelper().parse(entry)
+        return response
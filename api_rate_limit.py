@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+import os
+import time
+import threading
+
+
+class ApiRateLimiter:
+    """
+    A token bucket limiting how fast api calls are sent. One limiter is
+    shared by all threads of the process.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        """
+        Initializes the bucket full. Settings not passed in are read
+        from the environment.
+
+        Args:
+            - rate (float): calls per second, SDWC_RATE_LIMIT, 0 or
+              unset means unlimited.
+            - burst (int): calls that may be sent at once after an idle
+              period, SDWC_RATE_BURST, defaults to one second of rate.
+
+        Returns:
+            None.
+        """
+
+        if rate is None:
+            rate = float(os.environ.get("SDWC_RATE_LIMIT", 0))
+        if burst is None:
+            burst = float(os.environ.get("SDWC_RATE_BURST", 0))
+        self.rate = rate
+        self.burst = max(burst or rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, waiting until it is available. Each caller
+        reserves its slot under the lock and sleeps outside of it, so
+        waiting threads are released in order at the configured rate.
+
+        Returns:
+            wait (float): seconds spent waiting.
+        """
+
+        if self.rate <= 0:
+            return 0.0
+
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.updated
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = 0.0
+            if self.tokens < 0:
+                wait = -self.tokens / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+
+import os
+import threading
+import collections
+
+CACHE_SIZE = 256
+
+
+class ApiResponseCache:
+    """
+    A class for revalidating GET responses with ETag and Last-Modified.
+    The headers and raw body of each response are kept per url in least
+    recently used order. Decoded data is never kept, so every caller
+    decodes its own copy.
+    """
+
+    def __init__(self, size=None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            - size (int): urls to keep, SDWC_HTTP_CACHE_SIZE, 0 disables
+              conditional requests.
+
+        Returns:
+            None.
+        """
+
+        if size is None:
+            size = int(os.environ.get("SDWC_HTTP_CACHE_SIZE", CACHE_SIZE))
+        self.size = size
+        self.entries = collections.OrderedDict()
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        """
+        Returns the cached headers and body for a url.
+
+        Args:
+            - url (str): specified api endpoint.
+
+        Returns:
+            (tuple): the headers and the raw body, or None.
+        """
+
+        with self.lock:
+            response = self.entries.get(url)
+            if response is not None:
+                self.entries.move_to_end(url)
+            return response
+
+    def validators(self, headers):
+        """
+        Builds the conditional request headers for cached headers.
+
+        Args:
+            - headers (dict): the headers of the cached response.
+
+        Returns:
+            validators (dict): If-None-Match and If-Modified-Since.
+        """
+
+        validators = {}
+        if headers.get("ETag"):
+            validators["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        return validators
+
+    def store(self, url, response):
+        """
+        Keeps the headers and raw body of a successful response that
+        carries a validator.
+
+        Args:
+            - url (str): specified api endpoint.
+            - response (ApiResponse): the response to keep.
+
+        Returns:
+            None.
+        """
+
+        if self.size <= 0 or response.status != 200:
+            return
+        if not self.validators(response.headers):
+            return
+        with self.lock:
+            self.entries[url] = (response.headers, response.content)
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def count(self, name):
+        """
+        Records a hit or a miss.
+
+        Args:
+            - name (str): hits or misses.
+
+        Returns:
+            None.
+        """
+
+        with self.lock:
+            self.counts[name] += 1
+
+    def stats(self):
+        """
+        Shows how often cached responses were reused.
+
+        Returns:
+            stats (dict): hits, misses and the number of cached urls.
+        """
+
+        with self.lock:
+            return {
+                "hits": self.counts["hits"],
+                "misses": self.counts["misses"],
+                "entries": len(self.entries),
+            }
+
+    def clear(self):
+        """
+        Drops all cached responses.
+
+        Returns:
+            None.
+        """
+
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+
+import os
+import time
+import random
+import email.utils
+import requests
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ApiRetry:
+    """
+    A class describing when and how long to wait before an api call
+    is sent again.
+    """
+
+    def __init__(
+        self, max_attempts=None, base_delay=None, max_delay=None,
+        budget=None, jitter=0.5, statuses=RETRY_STATUSES
+    ):
+        """
+        Initializes the retry policy. Settings not passed in are read
+        from the environment and otherwise use the defaults.
+
+        Args:
+            - max_attempts (int): total tries including the first,
+              SDWC_RETRY_ATTEMPTS, default 4.
+            - base_delay (float): seconds before the first retry, doubled
+              for each further retry, SDWC_RETRY_BASE_DELAY, default 0.5.
+            - max_delay (float): upper bound of a single wait,
+              SDWC_RETRY_MAX_DELAY, default 30.
+            - budget (float): seconds after the first try in which retries
+              may still be sent, SDWC_RETRY_BUDGET, default 120.
+            - jitter (float): fraction of each wait that is randomized.
+            - statuses (tuple(int)): http status codes worth retrying.
+
+        Returns:
+            None.
+        """
+
+        self.max_attempts = self.setting(
+            max_attempts, "SDWC_RETRY_ATTEMPTS", 4, int
+        )
+        self.base_delay = self.setting(
+            base_delay, "SDWC_RETRY_BASE_DELAY", 0.5, float
+        )
+        self.max_delay = self.setting(
+            max_delay, "SDWC_RETRY_MAX_DELAY", 30.0, float
+        )
+        self.budget = self.setting(
+            budget, "SDWC_RETRY_BUDGET", 120.0, float
+        )
+        self.jitter = jitter
+        self.statuses = statuses
+
+    @staticmethod
+    def setting(value, name, default, cast):
+        """
+        Picks an explicit value, then the environment, then the default.
+
+        Args:
+            - value: the explicitly passed value or None.
+            - name (str): the environment variable.
+            - default: value used when neither is set.
+            - cast (type): conversion for the environment value.
+
+        Returns:
+            the chosen value.
+        """
+
+        if value is not None:
+            return value
+        return cast(os.environ.get(name, default))
+
+    def backoff(
+        self, attempt, started, idempotent, response=None, error=None
+    ):
+        """
+        Decides whether a failed try is sent again. Calls that are not
+        idempotent are only retried when the server cannot have acted
+        on them, which is a 429 answer or a connect timeout.
+
+        Args:
+            - attempt (int): number of the try that just failed.
+            - started (float): time.monotonic() of the first try.
+            - idempotent (bool): True if repeating the call is safe.
+            - response (obj): requests library response, if any.
+            - error (obj): requests library exception, if any.
+
+        Returns:
+            delay (float): seconds to wait, or None to stop retrying.
+        """
+
+        if attempt >= self.max_attempts:
+            return None
+
+        retry_after = None
+        if response is not None:
+            status = response.status_code
+            if status not in self.statuses:
+                return None
+            if not idempotent and status != 429:
+                return None
+            retry_after = self.retry_after(response)
+        elif error is not None:
+            if not idempotent and not isinstance(
+                error, requests.exceptions.ConnectTimeout
+            ):
+                return None
+
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay -= delay * self.jitter * random.random()
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if time.monotonic() - started + delay > self.budget:
+            return None
+        return delay
+
+    @staticmethod
+    def retry_after(response):
+        """
+        Reads the Retry-After header in either of its formats.
+
+        Args:
+            - response (obj): requests library response object.
+
+        Returns:
+            (float): seconds the server asked to wait, or None.
+        """
+
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(when.timestamp() - time.time(), 0.0)
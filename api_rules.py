@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
 import os
+from api_cache import ApiCache
+from api_trace import ApiTrace
 from api_helper import ApiHelper
 from api_authenticate import ApiAuthenticate
 
@@ -12,6 +14,7 @@ except KeyError:
     ApiHelper().print_env_error()
 
 
+@ApiTrace.traced_class
 class ApiRules:
     """
     A class for rule related api calls.
@@ -28,6 +31,7 @@ class ApiRules:
             - session (obj): session header with access token.
             - org_id (str): the accounts org id number.
             - url (str): the url specific to this class's api endpoint.
+            - cache (obj): shared name index for this endpoint.
 
         Returns:
             None.
@@ -40,6 +44,7 @@ class ApiRules:
             f"{SDWC_BASE_URL}/manage-accounts/{VERSION}/api/orgs/"
             f"{self.org_id}/rules"
         )
+        self.cache = ApiCache.for_url(self.url, "ruleId")
 
     def create(
         self, name,
@@ -66,7 +71,8 @@ class ApiRules:
         response = ApiHelper().http(
             "POST", self.session, self.url, payload=rule_data
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.insert(response)
         return response
 
     def delete(self, name):
@@ -83,13 +89,15 @@ class ApiRules:
         del_headers = {
             "x-http-method-override": "DELETE"
         }
-        self.session.headers.update(del_headers)
-        rule_id = self.get(name)["ruleId"]
+        rule_id = self.get(name, detail=False)["ruleId"]
         new_url = self.url + f"/{rule_id}"
         response = ApiHelper().http(
-            "POST", self.session, new_url
+            "POST", self.session, new_url, headers=del_headers,
+            idempotent=True
         )
         response = response["status"]
+        if 200 <= response < 300:
+            self.cache.evict(rule_id)
         return response
 
     def get_all(self):
@@ -103,26 +111,75 @@ class ApiRules:
         response = ApiHelper().http(
             "GET", self.session, self.url
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.update(response)
         return response
 
-    def get(self, name):
+    def iter_all(self):
+        """
+        Iterates over all rules while the response is being read,
+        for large orgs where get_all would hold the whole collection
+        in memory.
+
+        Returns:
+            (generator(dict)): settings for each of the rules.
+        """
+
+        yield from ApiHelper().iter_items(self.session, self.url)
+
+    def get(self, name, detail=True):
         """
         Shows configuration details for a specific rule.
+        With detail set to False the entry from the collection is
+        returned without requesting the full details.
 
         Args:
             - name (str): name of the rule.
+            - detail (bool): request the full details of the rule.
 
         Returns:
             response (list(dict)): settings for a rule.
         """
 
-        for rule in self.get_all():
-            if rule["name"] == name:
-                rule_id = rule["ruleId"]
-                new_url = f"{self.url}/{rule_id}"
-                response = ApiHelper().http(
-                    "GET", self.session, new_url
-                )
-                response = ApiHelper().parse(response["content"])
-                return response
+        rule = self.cache.lookup(name, self.get_all)
+        if rule is not None:
+            if not detail:
+                return dict(rule)
+            rule_id = rule["ruleId"]
+            new_url = f"{self.url}/{rule_id}"
+            response = ApiHelper().http(
+                "GET", self.session, new_url
+            )
+            response = ApiHelper().parse(response)
+            return response
+
+    def get_many(self, names, detail=True):
+        """
+        Shows configuration details for several rules. The collection
+        is loaded at most once and the details are fetched concurrently.
+
+        Args:
+            - names (list(str)): names of the rules.
+            - detail (bool): request the full details, otherwise the
+              collection entries are returned.
+
+        Returns:
+            response (dict): settings per name, None if not found.
+        """
+
+        rules = self.cache.lookup_many(names, self.get_all)
+        if not detail:
+            return {
+                name: None if rule is None else dict(rule)
+                for name, rule in rules.items()
+            }
+
+        urls = {
+            name: f"{self.url}/{rule['ruleId']}"
+            for name, rule in rules.items() if rule is not None
+        }
+        details = ApiHelper().http_many("GET", self.session, urls)
+        response = dict.fromkeys(names)
+        for name, entry in details.items():
+            response[name] = ApiHelper().parse(entry)
+        return response
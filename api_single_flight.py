@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+
+import threading
+import collections
+import concurrent.futures
+from api_deadline import ApiDeadline, ApiDeadlineExceeded
+
+
+class ApiSingleFlight:
+    """
+    A class for sharing one in-flight call between concurrent callers
+    asking for the same thing.
+    """
+
+    def __init__(self):
+        """
+        Initializes the table of in-flight calls.
+
+        Returns:
+            None.
+        """
+
+        self.calls = {}
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Runs func unless a call with the same key is already running,
+        in which case its result, or its exception, is shared. Callers
+        waiting on another call still honor their own deadline.
+
+        Args:
+            - key (tuple): identifies identical calls.
+            - func (callable): makes the call.
+
+        Returns:
+            the result of func.
+
+        Raises:
+            - ApiDeadlineExceeded
+        """
+
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = concurrent.futures.Future()
+                self.calls[key] = call
+                self.counts["calls"] += 1
+            else:
+                self.counts["shared"] += 1
+
+        if not leader:
+            deadline = ApiDeadline.current()
+            remaining = None if deadline is None else deadline.remaining()
+            try:
+                return call.result(timeout=remaining)
+            except concurrent.futures.TimeoutError:
+                deadline.check()
+                raise ApiDeadlineExceeded("deadline exceeded")
+
+        try:
+            result = func()
+        except BaseException as e:
+            with self.lock:
+                del self.calls[key]
+            call.set_exception(e)
+            raise
+        with self.lock:
+            del self.calls[key]
+        call.set_result(result)
+        return result
+
+    def stats(self):
+        """
+        Shows how many callers shared a call made by another caller.
+
+        Returns:
+            stats (dict): calls made and calls shared.
+        """
+
+        with self.lock:
+            return {
+                "calls": self.counts["calls"],
+                "shared": self.counts["shared"],
+            }
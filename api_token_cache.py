@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+REFRESH_MARGIN = 60
+
+
+class ApiTokenCache:
+    """
+    A class for keeping access tokens on disk between cli invocations.
+    """
+
+    def __init__(self, base_url, api_key):
+        """
+        Initializes the cache file location for a base url and api key.
+        The api key itself is never written to disk, only a hash of it.
+
+        Args:
+            - base_url (str): the api base url.
+            - api_key (str): the api key used for login.
+
+        Returns:
+            None.
+        """
+
+        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        entry = hashlib.sha256(f"{base_url}|{key_hash}".encode()).hexdigest()
+        self.base_url = base_url
+        self.key_hash = key_hash
+        self.directory = os.path.join(self.cache_dir(), "sdwc", "tokens")
+        self.path = os.path.join(self.directory, f"{entry}.json")
+
+    @staticmethod
+    def enabled():
+        """
+        The token cache is opt-in through the SDWC_TOKEN_CACHE
+        environment variable.
+
+        Returns:
+            (boolean): True if the cache should be used.
+        """
+
+        value = os.environ.get("SDWC_TOKEN_CACHE", "")
+        return value.lower() in ("1", "true", "yes", "on")
+
+    @staticmethod
+    def cache_dir():
+        """
+        Finds the per-user cache directory for the platform.
+
+        Returns:
+            (str): path of the user's cache directory.
+        """
+
+        if os.name == "nt":
+            return os.environ.get(
+                "LOCALAPPDATA", os.path.expanduser("~\\AppData\\Local")
+            )
+        return os.environ.get(
+            "XDG_CACHE_HOME", os.path.expanduser("~/.cache")
+        )
+
+    def load(self):
+        """
+        Reads the cached token. Tokens that are missing, unreadable,
+        issued for another base url or api key, or within
+        REFRESH_MARGIN seconds of expiry are ignored.
+
+        Returns:
+            token (dict): access_token, token_type, orgId, expires_at
+            or None if no usable token is cached.
+        """
+
+        try:
+            with open(self.path, "r") as cache_file:
+                token = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(token, dict):
+            return None
+        if token.get("base_url") != self.base_url:
+            return None
+        if token.get("key_hash") != self.key_hash:
+            return None
+        if token.get("expires_at", 0) - REFRESH_MARGIN <= time.time():
+            return None
+        return token
+
+    def save(self, token):
+        """
+        Writes the token atomically with owner-only permissions.
+        Failures are ignored since the cache is only an optimization.
+
+        Args:
+            - token (dict): access_token, token_type, orgId, expires_at.
+
+        Returns:
+            None.
+        """
+
+        entry = {
+            "base_url": self.base_url,
+            "key_hash": self.key_hash,
+            "access_token": token["access_token"],
+            "token_type": token["token_type"],
+            "orgId": token["orgId"],
+            "expires_at": token["expires_at"],
+        }
+
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.directory, suffix=".tmp"
+            )
+            try:
+                os.chmod(tmp_path, 0o600)
+                with os.fdopen(fd, "w") as cache_file:
+                    json.dump(entry, cache_file)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
+
+    def delete(self):
+        """
+        Removes the cached token, e.g. after the server rejected it.
+
+        Returns:
+            None.
+        """
+
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
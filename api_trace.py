@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+
+import os
+import json
+import time
+import inspect
+import itertools
+import functools
+import threading
+import contextvars
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+CURRENT_SPAN = contextvars.ContextVar("sdwc_span", default=None)
+
+
+class ApiSpan:
+    """
+    A class for one timed step of a traced run, such as a cli command,
+    an api method or an http call.
+    """
+
+    __slots__ = (
+        "name", "attrs", "span_id", "parent_id", "thread_id",
+        "start", "end", "token", "otel"
+    )
+
+    def __init__(self, name, attrs):
+        """
+        Initializes the span. Timing starts when it is entered.
+
+        Args:
+            - name (str): what the span measures.
+            - attrs (dict): details shown with the span.
+
+        Returns:
+            None.
+        """
+
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(ApiTrace.ids)
+        self.parent_id = None
+        self.thread_id = None
+        self.start = None
+        self.end = None
+        self.token = None
+        self.otel = None
+
+    def __enter__(self):
+        parent = CURRENT_SPAN.get()
+        if parent is not None:
+            self.parent_id = parent.span_id
+        self.thread_id = threading.get_ident()
+        self.token = CURRENT_SPAN.set(self)
+        if ApiTrace.otel_tracer is not None:
+            self.otel = ApiTrace.otel_tracer.start_as_current_span(
+                self.name, attributes=self.attrs
+            )
+            self.otel.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        if self.otel is not None:
+            self.otel.__exit__(exc_type, exc_value, traceback)
+        CURRENT_SPAN.reset(self.token)
+        ApiTrace.finish(self)
+
+
+class ApiNoSpan:
+    """
+    A span that does nothing, used while tracing is disabled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+NO_SPAN = ApiNoSpan()
+
+
+class ApiTrace:
+    """
+    A class for collecting spans with their parent and child relations
+    across threads. While tracing is disabled a traced call costs one
+    attribute check.
+    """
+
+    enabled = False
+    spans = []
+    lock = threading.Lock()
+    ids = itertools.count(1)
+    origin = 0.0
+    otel_tracer = None
+
+    @classmethod
+    def start(cls, otel=None):
+        """
+        Drops earlier spans and starts tracing.
+
+        Args:
+            - otel (bool): also report spans to OpenTelemetry when it is
+              installed, SDWC_TRACE_OTEL.
+
+        Returns:
+            None.
+        """
+
+        if otel is None:
+            otel = os.environ.get("SDWC_TRACE_OTEL", "").lower() in (
+                "1", "true", "yes", "on"
+            )
+        with cls.lock:
+            cls.spans = []
+        cls.origin = time.perf_counter()
+        cls.otel_tracer = None
+        if otel and otel_trace is not None:
+            cls.otel_tracer = otel_trace.get_tracer("sdwc")
+        cls.enabled = True
+
+    @classmethod
+    def stop(cls):
+        """
+        Stops tracing. Collected spans are kept for export.
+
+        Returns:
+            None.
+        """
+
+        cls.enabled = False
+        cls.otel_tracer = None
+
+    @classmethod
+    def span(cls, name, **attrs):
+        """
+        Creates a span to be used as a context manager.
+
+        Args:
+            - name (str): what the span measures.
+            - attrs (dict): details shown with the span.
+
+        Returns:
+            (ApiSpan): the span, or a no-op span when disabled.
+        """
+
+        if not cls.enabled:
+            return NO_SPAN
+        return ApiSpan(name, attrs)
+
+    @classmethod
+    def finish(cls, span):
+        """
+        Stores a completed span.
+
+        Args:
+            - span (ApiSpan): the completed span.
+
+        Returns:
+            None.
+        """
+
+        with cls.lock:
+            cls.spans.append(span)
+
+    @classmethod
+    def traced(cls, func):
+        """
+        A decorator running each call of func in a span named after its
+        qualified name, e.g. CliTest.find_network.
+
+        Args:
+            - func (callable): the function to trace.
+
+        Returns:
+            (callable): the wrapped function.
+        """
+
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cls.enabled:
+                return func(*args, **kwargs)
+            with ApiSpan(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    @classmethod
+    def traced_class(cls, klass):
+        """
+        A class decorator tracing every public method. Generator methods
+        are left alone since their work happens after they return.
+
+        Args:
+            - klass (type): the class to trace.
+
+        Returns:
+            (type): the same class.
+        """
+
+        for name, member in list(vars(klass).items()):
+            if name.startswith("_") or not inspect.isfunction(member):
+                continue
+            if inspect.isgeneratorfunction(member):
+                continue
+            setattr(klass, name, cls.traced(member))
+        return klass
+
+    @classmethod
+    def to_chrome(cls):
+        """
+        Formats the spans as Chrome trace events, for chrome://tracing
+        or Perfetto.
+
+        Returns:
+            (dict): the trace document.
+        """
+
+        pid = os.getpid()
+        with cls.lock:
+            spans = list(cls.spans)
+        events = []
+        for span in sorted(spans, key=lambda span: span.start):
+            args = {key: str(value) for key, value in span.attrs.items()}
+            args["span_id"] = span.span_id
+            args["parent_id"] = span.parent_id
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": (span.start - cls.origin) * 1e6,
+                "dur": (span.end - span.start) * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    @classmethod
+    def write_chrome(cls, path):
+        """
+        Writes the spans as a Chrome trace file.
+
+        Args:
+            - path (str): the output file.
+
+        Returns:
+            None.
+        """
+
+        with open(path, "w") as trace_file:
+            json.dump(cls.to_chrome(), trace_file)
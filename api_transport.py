@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+
+import os
+import socket
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 32
+KEEPALIVE_IDLE = 60
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
+
+class ApiTransportAdapter(HTTPAdapter):
+    """
+    A requests adapter that applies socket options to every pooled
+    connection, including connections made through a proxy.
+    """
+
+    def __init__(self, socket_options, **kwargs):
+        """
+        Initializes the adapter with the socket options to apply.
+
+        Args:
+            - socket_options (list(tuple)): setsockopt arguments.
+            - kwargs (dict): HTTPAdapter pool arguments.
+
+        Returns:
+            None.
+        """
+
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        """
+        Creates the pool manager with the socket options.
+
+        Returns:
+            None.
+        """
+
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        """
+        Creates the proxy pool manager with the socket options.
+
+        Args:
+            - proxy (str): the proxy url.
+
+        Returns:
+            (obj): urllib3 proxy manager.
+        """
+
+        proxy_kwargs["socket_options"] = self.socket_options
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+
+class ApiTransport:
+    """
+    A class for the connection pool settings shared by all api calls.
+    """
+
+    def __init__(
+        self, pool_connections=None, pool_maxsize=None, pool_block=None,
+        keepalive=None, tcp_nodelay=None, connect_timeout=None,
+        read_timeout=None
+    ):
+        """
+        Initializes the transport settings. Settings not passed in are
+        read from the environment and otherwise use the defaults.
+
+        Args:
+            - pool_connections (int): hosts to keep pools for,
+              SDWC_POOL_CONNECTIONS.
+            - pool_maxsize (int): connections kept per host, set it to
+              at least the number of concurrent workers,
+              SDWC_POOL_MAXSIZE.
+            - pool_block (bool): wait for a free connection instead of
+              opening one that is discarded afterwards,
+              SDWC_POOL_BLOCK.
+            - keepalive (int): idle seconds before tcp keepalive probes
+              are sent on pooled connections, 0 disables,
+              SDWC_KEEPALIVE.
+            - tcp_nodelay (bool): disable Nagle's algorithm,
+              SDWC_TCP_NODELAY.
+            - connect_timeout (float): seconds to wait for a connection,
+              SDWC_CONNECT_TIMEOUT.
+            - read_timeout (float): seconds to wait for data from the
+              server, SDWC_READ_TIMEOUT.
+
+        Returns:
+            None.
+        """
+
+        self.pool_connections = pool_connections
+        if pool_connections is None:
+            self.pool_connections = int(
+                os.environ.get("SDWC_POOL_CONNECTIONS", POOL_CONNECTIONS)
+            )
+
+        self.pool_maxsize = pool_maxsize
+        if pool_maxsize is None:
+            self.pool_maxsize = int(
+                os.environ.get("SDWC_POOL_MAXSIZE", POOL_MAXSIZE)
+            )
+
+        self.pool_block = pool_block
+        if pool_block is None:
+            self.pool_block = self.env_flag("SDWC_POOL_BLOCK", False)
+
+        self.keepalive = keepalive
+        if keepalive is None:
+            self.keepalive = int(
+                os.environ.get("SDWC_KEEPALIVE", KEEPALIVE_IDLE)
+            )
+
+        self.tcp_nodelay = tcp_nodelay
+        if tcp_nodelay is None:
+            self.tcp_nodelay = self.env_flag("SDWC_TCP_NODELAY", True)
+
+        self.connect_timeout = connect_timeout
+        if connect_timeout is None:
+            self.connect_timeout = float(
+                os.environ.get("SDWC_CONNECT_TIMEOUT", CONNECT_TIMEOUT)
+            )
+
+        self.read_timeout = read_timeout
+        if read_timeout is None:
+            self.read_timeout = float(
+                os.environ.get("SDWC_READ_TIMEOUT", READ_TIMEOUT)
+            )
+
+    @staticmethod
+    def env_flag(name, default):
+        """
+        Reads a boolean environment variable.
+
+        Args:
+            - name (str): the environment variable.
+            - default (bool): value when the variable is not set.
+
+        Returns:
+            (bool): the flag value.
+        """
+
+        value = os.environ.get(name)
+        if value is None:
+            return default
+        return value.lower() in ("1", "true", "yes", "on")
+
+    def socket_options(self):
+        """
+        Builds the socket options for the configured settings. Keepalive
+        timing options are only added where the platform has them.
+
+        Returns:
+            options (list(tuple)): setsockopt arguments.
+        """
+
+        options = []
+        if self.tcp_nodelay:
+            options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+        if self.keepalive > 0:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            for name, value in (
+                ("TCP_KEEPIDLE", self.keepalive),
+                ("TCP_KEEPINTVL", max(self.keepalive // 4, 1)),
+                ("TCP_KEEPCNT", 4),
+            ):
+                if hasattr(socket, name):
+                    options.append(
+                        (socket.IPPROTO_TCP, getattr(socket, name), value)
+                    )
+        return options
+
+    def timeout(self, deadline=None):
+        """
+        Builds the requests timeout for one call, shortened to what is
+        left of the deadline.
+
+        Args:
+            - deadline (ApiDeadline): the active deadline, if any.
+
+        Returns:
+            (tuple(float)): connect and read timeouts in seconds.
+        """
+
+        connect = self.connect_timeout
+        read = self.read_timeout
+        if deadline is not None:
+            remaining = max(deadline.remaining(), 0.001)
+            connect = min(connect, remaining)
+            read = min(read, remaining)
+        return (connect, read)
+
+    def mount(self, session):
+        """
+        Mounts the pooled adapter on a session for http and https and
+        asks for compressed responses in every encoding urllib3 can
+        decode here: gzip and deflate, plus br and zstd when the brotli
+        and zstandard packages are installed.
+
+        Args:
+            - session (obj): requests library session object.
+
+        Returns:
+            session (obj): the same session.
+        """
+
+        adapter = ApiTransportAdapter(
+            self.socket_options(),
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        return session
@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
 import os
+from api_cache import ApiCache
+from api_trace import ApiTrace
 from api_helper import ApiHelper
 from api_authenticate import ApiAuthenticate
 
@@ -12,6 +14,7 @@ except KeyError:
     ApiHelper().print_env_error()
 
 
+@ApiTrace.traced_class
 class ApiUsers:
     """
     A class for user related api calls.
@@ -28,6 +31,7 @@ class ApiUsers:
             - session (obj): session header with access token.
             - org_id (str): the accounts org id number.
             - url (str): the url specific to this class's api endpoint.
+            - cache (obj): shared name index for this endpoint.
 
         Returns:
             None.
@@ -40,6 +44,7 @@ class ApiUsers:
             f"{SDWC_BASE_URL}/manage-accounts/{VERSION}/api/orgs/"
             f"{self.org_id}/users"
         )
+        self.cache = ApiCache.for_url(self.url, "userId")
 
     def delete(self, name):
         """
@@ -55,13 +60,15 @@ class ApiUsers:
         del_headers = {
             "x-http-method-override": "DELETE"
         }
-        self.session.headers.update(del_headers)
-        user_id = self.get(name)["userId"]
+        user_id = self.get(name, detail=False)["userId"]
         new_url = self.url + f"/{user_id}"
         response = ApiHelper().http(
-            "POST", self.session, new_url
+            "POST", self.session, new_url, headers=del_headers,
+            idempotent=True
         )
         response = response["status"]
+        if 200 <= response < 300:
+            self.cache.evict(user_id)
         return response
 
     def get_all(self):
@@ -75,26 +82,75 @@ class ApiUsers:
         response = ApiHelper().http(
             "GET", self.session, self.url
         )
-        response = ApiHelper().parse(response["content"])
+        response = ApiHelper().parse(response)
+        self.cache.update(response)
         return response
 
-    def get(self, name):
+    def iter_all(self):
+        """
+        Iterates over all users while the response is being read,
+        for large orgs where get_all would hold the whole collection
+        in memory.
+
+        Returns:
+            (generator(dict)): settings for each of the users.
+        """
+
+        yield from ApiHelper().iter_items(self.session, self.url)
+
+    def get(self, name, detail=True):
         """
         Shows configuration details for a specific user.
+        With detail set to False the entry from the collection is
+        returned without requesting the full details.
 
         Args:
             - name (str): name of the user.
+            - detail (bool): request the full details of the user.
 
         Returns:
             response (list(dict)): settings for a user.
         """
 
-        for user in self.get_all():
-            if user["name"] == name:
-                user_id = user["userId"]
-                new_url = f"{self.url}/{user_id}"
-                response = ApiHelper().http(
-                    "GET", self.session, new_url
-                )
-                response = ApiHelper().parse(response["content"])
-                return response
+        user = self.cache.lookup(name, self.get_all)
+        if user is not None:
+            if not detail:
+                return dict(user)
+            user_id = user["userId"]
+            new_url = f"{self.url}/{user_id}"
+            response = ApiHelper().http(
+                "GET", self.session, new_url
+            )
+            response = ApiHelper().parse(response)
+            return response
+
+    def get_many(self, names, detail=True):
+        """
+        Shows configuration details for several users. The collection
+        is loaded at most once and the details are fetched concurrently.
+
+        Args:
+            - names (list(str)): names of the users.
+            - detail (bool): request the full details, otherwise the
+              collection entries are returned.
+
+        Returns:
+            response (dict): settings per name, None if not found.
+        """
+
+        users = self.cache.lookup_many(names, self.get_all)
+        if not detail:
+            return {
+                name: None if user is None else dict(user)
+                for name, user in users.items()
+            }
+
+        urls = {
+            name: f"{self.url}/{user['userId']}"
+            for name, user in users.items() if user is not None
+        }
+        details = ApiHelper().http_many("GET", self.session, urls)
+        response = dict.fromkeys(names)
+        for name, entry in details.items():
+            response[name] = ApiHelper().parse(entry)
+        return response
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+
+import sys
+import uuid
+import random
+import timeit
+import argparse
+from api_codec import ApiCodec
+
+
+class BenchCodec:
+    """
+    A microbenchmark of the json codecs on payloads shaped like the
+    collections returned by the api.
+    """
+
+    def __init__(self, users=20000, groups=500, networks=200):
+        """
+        Initializes the synthetic payloads as encoded json bytes.
+
+        Args:
+            - users (int): number of users in the users collection.
+            - groups (int): number of groups in the groups collection.
+            - networks (int): number of networks in the v2lans collection.
+
+        Returns:
+            None.
+        """
+
+        random.seed(7)
+        codec = ApiCodec("json")
+        self.payloads = {
+            "users": codec.dumps([self.user(i) for i in range(users)]),
+            "groups": codec.dumps([self.group(i) for i in range(groups)]),
+            "networks": codec.dumps(
+                [self.network(i) for i in range(networks)]
+            ),
+        }
+
+    @staticmethod
+    def object_id():
+        """
+        Returns a random uuid string like the ids used by the api.
+
+        Returns:
+            (str): the id.
+        """
+
+        return str(uuid.UUID(int=random.getrandbits(128)))
+
+    def user(self, i):
+        """
+        Builds a user entry.
+
+        Args:
+            - i (int): sequence number of the user.
+
+        Returns:
+            (dict): the user.
+        """
+
+        return {
+            "userId": self.object_id(),
+            "name": f"User Number {i}",
+            "email": f"user{i}@example.com",
+            "userType": random.choice(["USER", "GATEWAY", "SERVER"]),
+            "status": "active",
+            "role": random.choice(["standard", "admin", "owner"]),
+            "createdAt": "2024-03-01T12:30:00.000Z",
+            "lastLoginAt": "2024-05-17T08:11:42.123Z",
+            "groupIds": [self.object_id() for _ in range(3)],
+            "devices": [
+                {
+                    "deviceId": self.object_id(),
+                    "osType": random.choice(["WINDOWS", "MACOS", "LINUX"]),
+                    "osVersion": "10.0.19045",
+                    "clientVersion": "4.2.1",
+                    "online": random.random() < 0.5,
+                    "virtualIp": f"100.64.{i % 250}.{i % 200 + 1}",
+                }
+                for _ in range(2)
+            ],
+        }
+
+    def group(self, i):
+        """
+        Builds a group entry.
+
+        Args:
+            - i (int): sequence number of the group.
+
+        Returns:
+            (dict): the group.
+        """
+
+        return {
+            "groupId": self.object_id(),
+            "name": f"group-{i}",
+            "desc": "created by api user",
+            "userCount": random.randint(0, 500),
+            "createdAt": "2024-03-01T12:30:00.000Z",
+        }
+
+    def network(self, i):
+        """
+        Builds a network entry.
+
+        Args:
+            - i (int): sequence number of the network.
+
+        Returns:
+            (dict): the network.
+        """
+
+        nobs = [
+            {
+                "id": self.object_id(),
+                "name": f"group-{random.randint(0, 499)}",
+                "type": random.choice(["user", "group", "gateway"]),
+            }
+            for _ in range(8)
+        ]
+        return {
+            "v2lanId": self.object_id(),
+            "name": f"network-{i}",
+            "type": random.choice(["MESH", "HUB"]),
+            "isKeepConnected": False,
+            "rules": [f"rule-{random.randint(0, 40)}"],
+            "policy": {
+                "ruleIds": [self.object_id()],
+                "sourceContextId": self.object_id(),
+            },
+            "topology": {
+                "sourceNobs": nobs[:5],
+                "targetNobs": nobs[5:],
+            },
+        }
+
+    def run(self, number):
+        """
+        Times decoding and encoding of every payload with every
+        installed codec.
+
+        Args:
+            - number (int): repetitions per measurement.
+
+        Returns:
+            results (list(dict)): timings in milliseconds per call.
+        """
+
+        results = []
+        for name in ApiCodec.available():
+            codec = ApiCodec(name)
+            for payload, body in self.payloads.items():
+                data = codec.loads(body)
+                loads = timeit.timeit(lambda: codec.loads(body), number=number)
+                dumps = timeit.timeit(lambda: codec.dumps(data), number=number)
+                results.append({
+                    "codec": name,
+                    "payload": payload,
+                    "bytes": len(body),
+                    "loads_ms": loads / number * 1000,
+                    "dumps_ms": dumps / number * 1000,
+                })
+        return results
+
+
+def main():
+    """
+    Runs the benchmark and prints a table of the results.
+
+    Returns:
+        None.
+    """
+
+    parser = argparse.ArgumentParser(description="json codec benchmark")
+    parser.add_argument("--number", type=int, default=5)
+    parser.add_argument("--users", type=int, default=20000)
+    args = parser.parse_args()
+
+    bench = BenchCodec(users=args.users)
+    results = bench.run(args.number)
+
+    baseline = {
+        entry["payload"]: entry
+        for entry in results if entry["codec"] == "json"
+    }
+    print(
+        f"{'codec':8} {'payload':9} {'bytes':>10} {'loads ms':>10} "
+        f"{'dumps ms':>10} {'loads x':>8}"
+    )
+    for entry in results:
+        speedup = baseline[entry["payload"]]["loads_ms"] / entry["loads_ms"]
+        print(
+            f"{entry['codec']:8} {entry['payload']:9} {entry['bytes']:>10} "
+            f"{entry['loads_ms']:>10.2f} {entry['dumps_ms']:>10.2f} "
+            f"{speedup:>8.2f}"
+        )
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
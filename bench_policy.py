@@ -0,0 +1,567 @@
+#!/usr/bin/python3
+
+import sys
+import time
+import random
+import argparse
+import ipaddress
+from cli_policy import CliPolicy
+from cli_rule_matcher import DEFINED_SERVICES
+
+SERVICES = ["DNS", "HTTP", "HTTPS", "RDP", "SSH", "SMTP", "NTP", "NetBIOS"]
+WELL_KNOWN = [22, 53, 80, 123, 443, 3389]
+
+
+class BenchPolicy:
+    """
+    A benchmark of reachability queries on a synthetic org, comparing
+    the compiled CliPolicy with evaluating every network per query the
+    way test networks did before. Both run on objects held in memory,
+    so the api calls the old path made per query are not included.
+    The answers are checked against a separate implementation of the
+    per-network scan, see scan.
+    """
+
+    def __init__(self, users=5000, groups=300, connectors=100, rules=50,
+                 networks=500):
+        """
+        Initializes the synthetic org.
+
+        Args:
+            - users (int): number of users.
+            - groups (int): number of groups.
+            - connectors (int): number of client connectors.
+            - rules (int): number of rules.
+            - networks (int): number of networks.
+
+        Returns:
+            None.
+        """
+
+        random.seed(7)
+        self.users = [f"user{i}@example.com" for i in range(users)]
+        self.connectors = {
+            f"cc-{i}": self.connector(i) for i in range(connectors)
+        }
+        self.members = {
+            f"group-{i}": self.group() for i in range(groups)
+        }
+        self.rules = {f"rule-{i}": self.rule() for i in range(rules)}
+        self.networks = [self.network(i) for i in range(networks)]
+
+    def connector(self, i):
+        """
+        Builds a client connector advertising a few ranges and hosts.
+
+        Args:
+            - i (int): sequence number of the connector.
+
+        Returns:
+            (dict): the connector details.
+        """
+
+        ips = []
+        for j in range(3):
+            prefix = random.randint(0, 0xFFFFFF) << 8
+            size = random.choice([1, 16, 256, 4096])
+            ips.append({
+                "from": self.address(prefix),
+                "to": self.address(prefix + size - 1),
+            })
+        return {
+            "name": f"cc-{i}",
+            "gatewayIps": ips,
+            "dnsHosts": [
+                {"hostname": f"host{j}.site{i}.example.internal"}
+                for j in range(5)
+            ] + [{"hostname": f"*.apps.site{i}.example.internal"}],
+        }
+
+    @staticmethod
+    def address(value):
+        """
+        Formats an integer as dotted IPv4 address.
+
+        Args:
+            - value (int): the address.
+
+        Returns:
+            (str): the address.
+        """
+
+        value &= 0xFFFFFFFF
+        return ".".join(str(value >> shift & 255) for shift in (24, 16, 8, 0))
+
+    def group(self):
+        """
+        Builds the member list of a group.
+
+        Returns:
+            (list(dict)): the nodes of the group.
+        """
+
+        nodes = [
+            {"name": name, "userType": "USER"}
+            for name in random.sample(self.users, 25)
+        ]
+        if random.random() < 0.3:
+            name = random.choice(list(self.connectors))
+            nodes.append({"name": name, "userType": "GATEWAY"})
+        return nodes
+
+    @staticmethod
+    def rule():
+        """
+        Builds a rule with predefined and custom services.
+
+        Returns:
+            (dict): the rule details.
+        """
+
+        custom = []
+        for _ in range(random.randint(0, 4)):
+            port = random.choice([random.randint(1, 65000)] + WELL_KNOWN)
+            custom.append({
+                "portFrom": str(port),
+                "portTo": str(port + random.choice([0, 0, 10, 500])),
+                "transportType": random.choice(["TCP", "UDP"]),
+            })
+        return {
+            "predefinedNetworkServices": random.sample(SERVICES, 2),
+            "customNetworkServices": custom,
+        }
+
+    def node(self):
+        """
+        Builds a topology node.
+
+        Returns:
+            (dict): the node.
+        """
+
+        kind = random.choice(["user", "group", "group", "gateway"])
+        if kind == "user":
+            name = random.choice(self.users)
+        elif kind == "group":
+            name = random.choice(list(self.members))
+        else:
+            name = random.choice(list(self.connectors))
+        return {"type": kind, "name": name}
+
+    def network(self, i):
+        """
+        Builds a network.
+
+        Args:
+            - i (int): sequence number of the network.
+
+        Returns:
+            (dict): the network.
+        """
+
+        return {
+            "name": f"network-{i}",
+            "type": random.choice(["MESH", "HUB"]),
+            "rules": [random.choice(list(self.rules))],
+            "topology": {
+                "sourceNobs": [self.node() for _ in range(4)],
+                "targetNobs": [self.node() for _ in range(2)],
+            },
+        }
+
+    def pick(self, nodes):
+        """
+        Picks a name, address or hostname that belongs to a topology.
+
+        Args:
+            - nodes (list(dict)): the nodes of the topology.
+
+        Returns:
+            (str): the picked member.
+        """
+
+        node = random.choice(nodes)
+        if node["type"] == "group":
+            return random.choice(self.members[node["name"]])["name"]
+        if node["type"] == "gateway":
+            cc = self.connectors[node["name"]]
+            return random.choice([
+                node["name"],
+                random.choice(cc["gatewayIps"])["to"],
+                random.choice(cc["dnsHosts"])["hostname"],
+            ])
+        return node["name"]
+
+    def queries(self, count):
+        """
+        Builds random queries. Half of them are taken from the members
+        and rule of a network, so they are likely to match.
+
+        Args:
+            - count (int): number of queries.
+
+        Returns:
+            (list(tuple)): source, target, protocol and port.
+        """
+
+        queries = []
+        for _ in range(count):
+            network = random.choice(self.networks)
+            topology = network["topology"]
+            if random.random() < 0.5:
+                source = self.pick(topology["sourceNobs"])
+                if network["type"] == "HUB":
+                    target = self.pick(topology["targetNobs"])
+                else:
+                    target = self.pick(topology["sourceNobs"])
+                rule = self.rules[network["rules"][0]]
+                protocol = random.choice(rule["predefinedNetworkServices"])
+                queries.append((source, target, protocol.lower(), None))
+                continue
+
+            target = self.pick(topology["targetNobs"])
+            if random.random() < 0.2:
+                site = random.randrange(len(self.connectors))
+                target = random.choice([
+                    f"*.site{site}.example.internal",
+                    f"web.apps.site{site}.example.internal",
+                ])
+            if random.random() < 0.5:
+                protocol, port = random.choice(SERVICES).lower(), None
+            else:
+                protocol = random.choice(["tcp", "udp"])
+                port = str(random.choice(
+                    [random.randint(1, 65500)] + WELL_KNOWN
+                ))
+            queries.append(
+                (random.choice(self.users), target, protocol, port)
+            )
+        return queries
+
+    def scan(self, source, target, protocol, port, legacy=False):
+        """
+        Evaluates every network for one query, as test networks did
+        before the policy was compiled. The membership and rule checks
+        below are written out again on purpose and share no code with
+        CliPolicy, so agreement shows the index gives the same answers.
+
+        With legacy set, hostnames and rules are checked exactly as
+        before the wildcard DNS and service catalog changes. Without
+        it, those two deliberate changes are applied:
+            - DNS entries and targets may be *.domain or .domain
+              patterns and match when the names they cover overlap.
+            - a rule allowing a predefined service also allows its
+              catalog ports, a named service query also matches a rule
+              allowing one of its ports, and service names are compared
+              without regard to case.
+
+        Args:
+            - source (str): the source.
+            - target (str): the target.
+            - protocol (str): the protocol or named service.
+            - port (str): the destination port.
+            - legacy (bool): use the semantics from before the changes.
+
+        Returns:
+            (list(str)): names of the matching networks.
+        """
+
+        hits = []
+        for network in self.networks:
+            topology = network["topology"]
+            sources = self.scan_members(topology["sourceNobs"])
+            targets = self.scan_members(topology["targetNobs"])
+            rule = network["rules"][0] if network["rules"] else None
+            if rule is None or rule not in self.rules:
+                continue
+            if legacy:
+                allowed = self.legacy_rule(self.rules[rule], protocol, port)
+            else:
+                allowed = self.scan_rule(self.rules[rule], protocol, port)
+            if not allowed:
+                continue
+            if network["type"] == "MESH":
+                if self.scan_contains(sources, source, legacy) and (
+                    self.scan_contains(sources, target, legacy)
+                ):
+                    hits.append(network["name"])
+            elif network["type"] == "HUB":
+                if self.scan_contains(sources, source, legacy) and (
+                    self.scan_contains(targets, target, legacy)
+                ):
+                    hits.append(network["name"])
+        return hits
+
+    def scan_members(self, nodes):
+        """
+        Collects the names, IP ranges and hostnames of a topology.
+
+        Args:
+            - nodes (list(dict)): the nodes of the topology.
+
+        Returns:
+            (tuple): names, ranges and hostnames.
+        """
+
+        names, ranges, hosts = set(), [], []
+
+        def add_connector(name):
+            cc = self.connectors.get(name)
+            if cc is None:
+                return
+            for ip in cc["gatewayIps"] or []:
+                start = ipaddress.ip_address(ip["from"])
+                stop = ipaddress.ip_address(ip["to"])
+                ranges.append((start.version, int(start), int(stop)))
+            for entry in cc["dnsHosts"] or []:
+                hosts.append(entry["hostname"])
+
+        for node in nodes:
+            if node["type"] == "group":
+                for member in self.members.get(node["name"]) or []:
+                    if member["userType"] == "GATEWAY":
+                        add_connector(member["name"])
+                    names.add(member["name"])
+            elif node["type"] == "gateway":
+                add_connector(node["name"])
+                names.add(node["name"])
+            else:
+                names.add(node["name"])
+        return names, ranges, hosts
+
+    def scan_contains(self, members, target, legacy):
+        """
+        Checks a target against the members of a topology with linear
+        scans.
+
+        Args:
+            - members (tuple): names, ranges and hostnames.
+            - target (str): the name, IP or hostname.
+            - legacy (bool): match hostnames exactly.
+
+        Returns:
+            (bool): True if the target is a member.
+        """
+
+        names, ranges, hosts = members
+        if target in names:
+            return True
+        try:
+            address = ipaddress.ip_address(target)
+        except ValueError:
+            address = None
+        if address is not None:
+            for version, start, stop in ranges:
+                if version == address.version and (
+                    start <= int(address) <= stop
+                ):
+                    return True
+        if legacy:
+            return target in hosts
+        return any(self.dns_overlap(host, target) for host in hosts)
+
+    @staticmethod
+    def dns_overlap(first, second):
+        """
+        Checks whether two DNS names or patterns cover a common name. A
+        *.domain pattern covers every name below the domain, and a
+        .domain pattern also covers the domain itself.
+
+        Args:
+            - first (str): a name, *.domain or .domain.
+            - second (str): a name, *.domain or .domain.
+
+        Returns:
+            (bool): True if some name is covered by both.
+        """
+
+        def parse(name):
+            name = name.strip().lower().rstrip(".")
+            if name.startswith("*."):
+                return "wildcard", name[2:]
+            if name.startswith("."):
+                return "suffix", name[1:]
+            return "exact", name
+
+        def below(name, domain):
+            return name.endswith("." + domain)
+
+        first_kind, first = parse(first)
+        second_kind, second = parse(second)
+        if first_kind == "exact" and second_kind == "exact":
+            return first == second
+        if first_kind != "exact" and second_kind != "exact":
+            return (
+                first == second or below(first, second)
+                or below(second, first)
+            )
+        if first_kind == "exact":
+            first_kind, first, second_kind, second = (
+                second_kind, second, first_kind, first
+            )
+        if first_kind == "wildcard":
+            return below(second, first)
+        return second == first or below(second, first)
+
+    @staticmethod
+    def legacy_rule(rule, protocol, port):
+        """
+        Checks a rule exactly as CliTest.validate_rule did before the
+        service catalog was added.
+
+        Args:
+            - rule (dict): the rule details.
+            - protocol (str): the protocol or named service.
+            - port (str): the destination port.
+
+        Returns:
+            (bool): True if the rule allows the traffic.
+        """
+
+        port = 99999 if port is None else int(port)
+        for entry in rule["predefinedNetworkServices"] or []:
+            if entry == protocol.upper():
+                return True
+        for entry in rule["customNetworkServices"] or []:
+            port_from = int(entry["portFrom"])
+            port_to = int(entry["portTo"])
+            transport = entry["transportType"].lower()
+            if port_from <= port <= port_to and protocol == transport:
+                return True
+        return False
+
+    @staticmethod
+    def scan_rule(rule, protocol, port):
+        """
+        Checks a rule with the service catalog by comparing every
+        allowed transport and port range with the requested ones.
+
+        Args:
+            - rule (dict): the rule details.
+            - protocol (str): the protocol or named service.
+            - port (str): the destination port.
+
+        Returns:
+            (bool): True if the rule allows the traffic.
+        """
+
+        predefined = [
+            entry.upper()
+            for entry in rule["predefinedNetworkServices"] or []
+        ]
+        if protocol.upper() in predefined:
+            return True
+
+        allowed = []
+        for service in predefined:
+            allowed.extend(DEFINED_SERVICES.get(service, []))
+        for entry in rule["customNetworkServices"] or []:
+            allowed.append((
+                entry["transportType"].lower(),
+                int(entry["portFrom"]), int(entry["portTo"])
+            ))
+
+        wanted = DEFINED_SERVICES.get(protocol.upper())
+        if wanted is None:
+            value = None if port is None else int(port)
+            wanted = [(protocol.lower(), value, value)]
+
+        for transport, port_from, port_to in wanted:
+            for allowed_transport, allowed_from, allowed_to in allowed:
+                if transport != allowed_transport:
+                    continue
+                if port_from is None or allowed_from is None:
+                    if port_from is None and allowed_from is None:
+                        return True
+                elif port_from <= allowed_to and allowed_from <= port_to:
+                    return True
+        return False
+
+    def run(self, count):
+        """
+        Times the per-network scan and the compiled policy on the same
+        queries. The compiled answers must equal the scan with the
+        current semantics, and must include every legacy answer, since
+        the deliberate changes only add matches.
+
+        Args:
+            - count (int): number of queries.
+
+        Returns:
+            results (dict): timings in milliseconds.
+        """
+
+        queries = self.queries(count)
+
+        started = time.perf_counter()
+        legacy = [self.scan(*query, legacy=True) for query in queries]
+        scan = time.perf_counter() - started
+
+        expected = [self.scan(*query) for query in queries]
+
+        started = time.perf_counter()
+        policy = CliPolicy()
+        policy.compile(
+            self.networks, self.members, self.connectors, self.rules
+        )
+        compiled = time.perf_counter() - started
+
+        started = time.perf_counter()
+        answers = [policy.query(*query) for query in queries]
+        query = time.perf_counter() - started
+
+        for query_args, answer, reference, old in zip(
+            queries, answers, expected, legacy
+        ):
+            if answer != reference:
+                raise Exception(
+                    f"compiled policy and scan disagree on {query_args}: "
+                    f"{answer} != {reference}"
+                )
+            if not set(old) <= set(answer):
+                raise Exception(
+                    f"compiled policy lost legacy matches on {query_args}"
+                )
+
+        return {
+            "queries": count,
+            "matches": sum(len(answer) for answer in answers),
+            "changed": sum(
+                answer != old for answer, old in zip(answers, legacy)
+            ),
+            "scan_ms": scan / count * 1000,
+            "compile_ms": compiled * 1000,
+            "query_ms": query / count * 1000,
+        }
+
+
+def main():
+    """
+    Runs the benchmark and prints the results.
+
+    Returns:
+        None.
+    """
+
+    parser = argparse.ArgumentParser(description="reachability benchmark")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--networks", type=int, default=500)
+    parser.add_argument("--users", type=int, default=5000)
+    args = parser.parse_args()
+
+    bench = BenchPolicy(users=args.users, networks=args.networks)
+    result = bench.run(args.queries)
+
+    print(f"networks          {args.networks:>10}")
+    print(f"queries           {result['queries']:>10}")
+    print(f"matches           {result['matches']:>10}")
+    print(f"changed answers   {result['changed']:>10}")
+    print(f"scan ms/query     {result['scan_ms']:>10.3f}")
+    print(f"compile ms        {result['compile_ms']:>10.3f}")
+    print(f"compiled ms/query {result['query_ms']:>10.4f}")
+    print(f"speedup per query {result['scan_ms'] / result['query_ms']:>10.0f}")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 
+from api_trace import ApiTrace
 from api_client_connectors import ApiClientConnectors
 
 
+@ApiTrace.traced_class
 class CliClientConnectors:
     """
     A class for client connector api calls via the cli utility.
@@ -52,5 +54,7 @@ class CliClientConnectors:
             return output
 
         elif args.name:
-            output = ApiClientConnectors().get(args.name)
+            output = ApiClientConnectors().get(
+                args.name, detail=not args.summary
+            )
             return output
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 
+from api_trace import ApiTrace
 from api_contexts import ApiContexts
 
 
+@ApiTrace.traced_class
 class CliContexts:
     """
     A class for context api calls via the cli utility.
@@ -52,5 +54,7 @@ class CliContexts:
             return output
 
         elif args.name:
-            output = ApiContexts().get(args.name)
+            output = ApiContexts().get(
+                args.name, detail=not args.summary
+            )
             return output
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 
+from api_trace import ApiTrace
 from api_groups import ApiGroups
 
 
+@ApiTrace.traced_class
 class CliGroups:
     """
     A class for group api calls via the cli utility.
@@ -52,5 +54,7 @@ class CliGroups:
             return output
 
         elif args.name:
-            output = ApiGroups().get(args.name)
+            output = ApiGroups().get(
+                args.name, detail=not args.summary
+            )
             return output
@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 
+import sys
 import json
+from api_helper import ApiHelper
 
 
 class CliHelper:
@@ -34,3 +36,42 @@ class CliHelper:
         """
 
         print(f"Status Code: {entry}")
+
+    def print_jsonl(self, entry):
+        """
+        A printing function for one result per line, so a stream of
+        results can be read as json lines while it is written.
+
+        Args:
+            - entry (dict): a dictionary to be printed.
+
+        Returns:
+            None
+        """
+
+        print(json.dumps(entry, sort_keys=True))
+
+    def write_metrics(self, target, metrics_format="json"):
+        """
+        Writes the api call metrics collected during the command.
+
+        Args:
+            - target (str): file path, or - for standard error so the
+              command output stays parseable.
+            - metrics_format (str): json or prometheus.
+
+        Returns:
+            None
+        """
+
+        if metrics_format == "prometheus":
+            text = ApiHelper().metrics.to_prometheus()
+        else:
+            text = json.dumps(ApiHelper().stats(), sort_keys=True, indent=4)
+            text += "\n"
+
+        if target == "-":
+            sys.stderr.write(text)
+        else:
+            with open(target, "w") as metrics_file:
+                metrics_file.write(text)
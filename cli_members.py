@@ -0,0 +1,259 @@
+#!/usr/bin/python3
+
+import ipaddress
+
+IPV6_OFFSET = 1 << 32
+
+
+class CliIpRanges:
+    """
+    A class for a set of IP addresses kept as sorted, merged integer
+    intervals, so a /8 costs the same memory as a single address. IPv6
+    addresses are placed after the IPv4 space so both fit in one list.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty set of ranges.
+
+        Returns:
+            None.
+        """
+
+        self.starts = []
+        self.ends = []
+        self.pending = []
+
+    @staticmethod
+    def to_int(address):
+        """
+        Converts an IP address to its position in the interval space.
+
+        Args:
+            - address (str): the IPv4 or IPv6 address.
+
+        Returns:
+            (int): the position, None if it is not an IP address.
+        """
+
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return None
+        if address.version == 6:
+            return IPV6_OFFSET + int(address)
+        return int(address)
+
+    def add(self, start, stop):
+        """
+        Adds an inclusive range of addresses of the same IP version.
+
+        Args:
+            - start (str): the first IP address.
+            - stop (str): the last IP address.
+
+        Returns:
+            (boolean): False if the range is not made of IP addresses.
+        """
+
+        start = self.to_int(start)
+        stop = self.to_int(stop)
+        if start is None or stop is None:
+            return False
+        if (start >= IPV6_OFFSET) != (stop >= IPV6_OFFSET):
+            return False
+        if start > stop:
+            start, stop = stop, start
+        self.pending.append((start, stop))
+        return True
+
+    def intervals(self):
+        """
+        Merges added ranges into sorted, non-overlapping intervals.
+
+        Returns:
+            (list(tuple(int))): the start and stop of each interval.
+        """
+
+        if self.pending:
+            merged = []
+            ranges = sorted(self.pending + list(zip(self.starts, self.ends)))
+            for start, stop in ranges:
+                if merged and start <= merged[-1][1] + 1:
+                    if stop > merged[-1][1]:
+                        merged[-1][1] = stop
+                else:
+                    merged.append([start, stop])
+            self.starts = [start for start, stop in merged]
+            self.ends = [stop for start, stop in merged]
+            self.pending = []
+        return list(zip(self.starts, self.ends))
+
+
+class CliDnsNode:
+    """
+    A node of CliDnsTrie, one DNS label below its parent.
+    """
+
+    __slots__ = ("children", "exact", "wildcard", "suffix", "below")
+
+    def __init__(self):
+        self.children = {}
+        self.exact = set()
+        self.wildcard = set()
+        self.suffix = set()
+        self.below = set()
+
+
+class CliDnsTrie:
+    """
+    A class for DNS names indexed by their labels in reverse order, so
+    example.internal is the parent of db.example.internal. Entries can
+    be exact names, *.domain wildcards covering every name below the
+    domain, or .domain suffixes covering the domain and every name
+    below it. Queries take the same three forms and match in both
+    directions: a.corp.example.internal finds *.corp.example.internal
+    and *.example.internal finds db.example.internal. A lookup walks
+    one node per label, whatever the number of entries.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty trie.
+
+        Returns:
+            None.
+        """
+
+        self.root = CliDnsNode()
+
+    @staticmethod
+    def split(name):
+        """
+        Splits a name into its kind and its labels, last label first.
+
+        Args:
+            - name (str): a name, *.domain or .domain.
+
+        Returns:
+            (tuple): exact, wildcard or suffix, and the labels.
+        """
+
+        name = name.strip().lower().rstrip(".")
+        if name.startswith("*."):
+            kind, name = "wildcard", name[2:]
+        elif name.startswith("."):
+            kind, name = "suffix", name[1:]
+        else:
+            kind = "exact"
+        return kind, name.split(".")[::-1]
+
+    def add(self, name, value=None):
+        """
+        Adds an entry.
+
+        Args:
+            - name (str): a name, *.domain or .domain.
+            - value (obj): what a match returns, defaults to the name.
+
+        Returns:
+            None.
+        """
+
+        value = name if value is None else value
+        kind, labels = self.split(name)
+        node = self.root
+        for label in labels:
+            node.below.add(value)
+            node = node.children.setdefault(label, CliDnsNode())
+        getattr(node, kind).add(value)
+
+    def find(self, query):
+        """
+        Finds the entries matching a name, *.domain or .domain.
+
+        Args:
+            - query (str): the name to look up.
+
+        Returns:
+            (set): the values of the matching entries.
+        """
+
+        kind, labels = self.split(query)
+        found = set()
+        node = self.root
+        for label in labels:
+            found.update(node.wildcard)
+            found.update(node.suffix)
+            node = node.children.get(label)
+            if node is None:
+                return found
+
+        found.update(node.suffix)
+        if kind != "wildcard":
+            found.update(node.exact)
+        if kind != "exact":
+            found.update(node.wildcard)
+            found.update(node.below)
+        return found
+
+class CliMembers:
+    """
+    A class for the nodes of a network topology: node names, the IP
+    ranges and the DNS hostnames their client connectors advertise.
+    Targets are matched against them through CliMemberIndex.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty member set.
+
+        Returns:
+            None.
+        """
+
+        self.names = set()
+        self.hosts = set()
+        self.ips = CliIpRanges()
+
+    def add_name(self, name):
+        """
+        Adds a node name such as a user, server or connector.
+
+        Args:
+            - name (str): the node name.
+
+        Returns:
+            None.
+        """
+
+        self.names.add(name)
+
+    def add_host(self, hostname):
+        """
+        Adds a DNS hostname advertised by a connector.
+
+        Args:
+            - hostname (str): the hostname.
+
+        Returns:
+            None.
+        """
+
+        self.hosts.add(hostname)
+
+    def add_range(self, start, stop):
+        """
+        Adds an IP range advertised by a connector. A single entry that
+        is not an IP address is kept as a name and matched exactly.
+
+        Args:
+            - start (str): the first IP address.
+            - stop (str): the last IP address.
+
+        Returns:
+            None.
+        """
+
+        if not self.ips.add(start, stop) and start == stop:
+            self.names.add(start)
@@ -2,11 +2,13 @@
 
 from api_rules import ApiRules
 from api_users import ApiUsers
+from api_trace import ApiTrace
 from api_groups import ApiGroups
 from api_contexts import ApiContexts
 from api_networks import ApiNetworks
 
 
+@ApiTrace.traced_class
 class CliNetworks:
     """
     A class for network api calls via the cli utility.
@@ -26,10 +28,12 @@ class CliNetworks:
 
         user_list = []
         group_list = []
+        users = ApiUsers().get_many(nodes, detail=False)
+        groups = ApiGroups().get_many(nodes, detail=False)
 
         for node in nodes:
-            a_user = ApiUsers().get(node)
-            a_group = ApiGroups().get(node)
+            a_user = users[node]
+            a_group = groups[node]
 
             if a_user is not None:
                 user_list.append(a_user["userId"])
@@ -65,10 +69,10 @@ class CliNetworks:
         destinations = [elem.strip() for elem in destinations]
         destinations_dict = self.build_nodes_dict(destinations)
 
-        rule = ApiRules().get(args.rule)
+        rule = ApiRules().get(args.rule, detail=False)
         rule = rule["ruleId"]
 
-        context = ApiContexts().get(args.context)
+        context = ApiContexts().get(args.context, detail=False)
         context = context["contextId"]
 
         output = ApiNetworks().create_hub_spoke(
@@ -97,10 +101,10 @@ class CliNetworks:
         sources = [elem.strip() for elem in sources]
         sources_dict = self.build_nodes_dict(sources)
 
-        rule = ApiRules().get(args.rule)
+        rule = ApiRules().get(args.rule, detail=False)
         rule = rule["ruleId"]
 
-        context = ApiContexts().get(args.context)
+        context = ApiContexts().get(args.context, detail=False)
         context = context["contextId"]
 
         output = ApiNetworks().create_mesh(
@@ -142,5 +146,7 @@ class CliNetworks:
             return output
 
         elif args.name:
-            output = ApiNetworks().get(args.name)
+            output = ApiNetworks().get(
+                args.name, detail=not args.summary
+            )
             return output
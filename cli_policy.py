@@ -0,0 +1,463 @@
+#!/usr/bin/python3
+
+import bisect
+import itertools
+import collections
+from concurrent.futures import ProcessPoolExecutor
+from api_trace import ApiTrace
+from cli_rule_matcher import CliRuleMatcher
+from cli_members import CliMembers, CliDnsTrie, CliIpRanges
+
+EMPTY = frozenset()
+
+
+class CliPostings:
+    """
+    A class for mapping integer intervals, such as IP ranges or port
+    ranges, to the set of networks they belong to. Overlapping intervals
+    are split into disjoint segments, each with its own posting set, so
+    a lookup is one binary search.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty index.
+
+        Returns:
+            None.
+        """
+
+        self.ranges = []
+        self.bounds = []
+        self.postings = []
+
+    def add(self, start, stop, value):
+        """
+        Adds an inclusive interval for a value.
+
+        Args:
+            - start (int): the first point of the interval.
+            - stop (int): the last point of the interval.
+            - value (int): the network the interval belongs to.
+
+        Returns:
+            None.
+        """
+
+        self.ranges.append((start, stop, value))
+
+    def build(self):
+        """
+        Splits the added intervals into disjoint segments.
+
+        Returns:
+            None.
+        """
+
+        events = collections.defaultdict(list)
+        for start, stop, value in self.ranges:
+            events[start].append((value, 1))
+            events[stop + 1].append((value, -1))
+
+        active = collections.Counter()
+        self.bounds = []
+        self.postings = []
+        for bound in sorted(events):
+            for value, change in events[bound]:
+                active[value] += change
+                if not active[value]:
+                    del active[value]
+            postings = frozenset(active)
+            if self.postings and self.postings[-1] == postings:
+                continue
+            self.bounds.append(bound)
+            self.postings.append(postings)
+
+    def find(self, point):
+        """
+        Finds the networks whose intervals contain a point.
+
+        Args:
+            - point (int): the point to look up.
+
+        Returns:
+            (frozenset(int)): the matching networks.
+        """
+
+        index = bisect.bisect_right(self.bounds, point) - 1
+        if index < 0:
+            return EMPTY
+        return self.postings[index]
+
+
+class CliMemberIndex:
+    """
+    A class for mapping node names, IP addresses and DNS hostnames to
+    the networks that contain them.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty index.
+
+        Returns:
+            None.
+        """
+
+        self.names = collections.defaultdict(set)
+        self.hosts = CliDnsTrie()
+        self.ips = CliPostings()
+
+    def add(self, members, value):
+        """
+        Adds the members of a network.
+
+        Args:
+            - members (CliMembers): the members of the network.
+            - value (int): the network.
+
+        Returns:
+            None.
+        """
+
+        for name in members.names:
+            self.names[name].add(value)
+        for host in members.hosts:
+            self.hosts.add(host, value)
+        for start, stop in members.ips.intervals():
+            self.ips.add(start, stop, value)
+
+    def build(self):
+        """
+        Prepares the index for lookups.
+
+        Returns:
+            None.
+        """
+
+        self.ips.build()
+
+    def find(self, target):
+        """
+        Finds the networks containing a node name, IP or hostname.
+
+        Args:
+            - target (str): the node name, IP or hostname.
+
+        Returns:
+            (set(int)): the matching networks.
+        """
+
+        found = set(self.names.get(target, EMPTY))
+        found.update(self.hosts.find(target))
+        address = CliIpRanges.to_int(target)
+        if address is not None:
+            found.update(self.ips.find(address))
+        return found
+
+
+class CliRuleIndex:
+    """
+    A class for mapping a protocol or named service, and a destination
+    port, to the networks whose rule allows them, see CliRuleMatcher.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty index.
+
+        Returns:
+            None.
+        """
+
+        self.services = collections.defaultdict(set)
+        self.portless = collections.defaultdict(set)
+        self.ports = collections.defaultdict(CliPostings)
+
+    def add(self, rule, value):
+        """
+        Adds the rule of a network.
+
+        Args:
+            - rule (dict): the rule details.
+            - value (int): the network.
+
+        Returns:
+            None.
+        """
+
+        matcher = CliRuleMatcher(rule)
+        for service in matcher.services:
+            self.services[service].add(value)
+        for transport in matcher.portless:
+            self.portless[transport].add(value)
+        for transport, (starts, ends) in matcher.ports.items():
+            for port_from, port_to in zip(starts, ends):
+                self.ports[transport].add(port_from, port_to, value)
+
+    def build(self):
+        """
+        Prepares the index for lookups.
+
+        Returns:
+            None.
+        """
+
+        for ports in self.ports.values():
+            ports.build()
+
+    def find(self, protocol, port):
+        """
+        Finds the networks whose rule allows a protocol and port.
+
+        Args:
+            - protocol (str): tcp, udp, icmp or named service.
+            - port (str): destination port, None if not given.
+
+        Returns:
+            (set(int)): the matching networks.
+        """
+
+        found = set(self.services.get(protocol.upper(), EMPTY))
+        for transport, value in CliRuleMatcher.flows(protocol, port):
+            if value is None:
+                found.update(self.portless.get(transport, EMPTY))
+            elif transport in self.ports:
+                found.update(self.ports[transport].find(value))
+        return found
+
+
+@ApiTrace.traced_class
+class CliPolicy:
+    """
+    A class for answering reachability queries from a compiled model of
+    the networks. Networks, rules, group members and client connectors
+    are indexed once, so each query intersects a few posting sets
+    instead of evaluating every network again.
+    """
+
+    shared = None
+
+    def __init__(self):
+        """
+        Initializes an empty policy.
+
+        Returns:
+            None.
+        """
+
+        self.networks = []
+        self.sources = CliMemberIndex()
+        self.targets = CliMemberIndex()
+        self.rules = CliRuleIndex()
+
+    def compile(self, networks, members, connectors, rules):
+        """
+        Builds the indexes from already loaded objects.
+
+        Args:
+            - networks (list(dict)): all networks.
+            - members (dict): nodes per group name.
+            - connectors (dict): client connector details per name.
+            - rules (dict): rule details per name.
+
+        Returns:
+            None.
+        """
+
+        for value, network in enumerate(networks):
+            self.networks.append(network["name"])
+            topology = network["topology"]
+            sources = self.build_members(
+                topology["sourceNobs"], members, connectors
+            )
+
+            if network["type"] == "MESH":
+                targets = sources
+            elif network["type"] == "HUB":
+                targets = self.build_members(
+                    topology["targetNobs"], members, connectors
+                )
+            else:
+                continue
+
+            rule = rules.get(network["rules"][0]) if network["rules"] else None
+            if rule is None:
+                continue
+
+            self.sources.add(sources, value)
+            self.targets.add(targets, value)
+            self.rules.add(rule, value)
+
+        self.sources.build()
+        self.targets.build()
+        self.rules.build()
+
+    @staticmethod
+    def build_members(values, members, connectors):
+        """
+        Collects the members of a topology from loaded objects. Groups
+        add their nodes, and connectors, also those in groups, add the
+        IP ranges and DNS entries they advertise.
+
+        Args:
+            - values (list(dict)): the nodes of the topology.
+            - members (dict): nodes per group name.
+            - connectors (dict): client connector details per name.
+
+        Returns:
+            (CliMembers): the members of the topology.
+        """
+
+        member_list = CliMembers()
+        for value in values:
+
+            if value["type"] == "group":
+                for node in members.get(value["name"]) or []:
+                    if node["userType"] == "GATEWAY":
+                        CliPolicy.add_targets(
+                            member_list, connectors.get(node["name"])
+                        )
+                    member_list.add_name(node["name"])
+
+            elif value["type"] == "gateway":
+                CliPolicy.add_targets(
+                    member_list, connectors.get(value["name"])
+                )
+                member_list.add_name(value["name"])
+
+            else:
+                member_list.add_name(value["name"])
+
+        return member_list
+
+    @staticmethod
+    def add_targets(member_list, cc):
+        """
+        Adds the IP ranges and DNS entries a client connector advertises.
+
+        Args:
+            - member_list (CliMembers): the members to extend.
+            - cc (dict): the client connector details.
+
+        Returns:
+            None.
+        """
+
+        if cc is None:
+            return
+        for ip in cc["gatewayIps"] or []:
+            member_list.add_range(ip["from"], ip["to"])
+        for entry in cc["dnsHosts"] or []:
+            member_list.add_host(entry["hostname"])
+
+    def query(self, source, target, protocol, port=None):
+        """
+        Finds the networks letting a source reach a target with a
+        protocol and port.
+
+        Args:
+            - source (str): the name, IP or hostname of the source.
+            - target (str): the name, IP or hostname of the target.
+            - protocol (str): tcp, udp, icmp or named service.
+            - port (str): destination port, only for tcp or udp.
+
+        Returns:
+            (list(str)): names of the matching networks, in api order.
+        """
+
+        found = self.rules.find(protocol, port)
+        if found:
+            found &= self.sources.find(source)
+        if found:
+            found &= self.targets.find(target)
+        return [self.networks[value] for value in sorted(found)]
+
+    def check(self, flow):
+        """
+        Answers the query of one flow.
+
+        Args:
+            - flow (dict): source, target, protocol and port of the flow.
+
+        Returns:
+            result (dict): the flow with its matching networks, or with
+            an error if the flow could not be read or evaluated.
+        """
+
+        result = dict(flow)
+        if "error" in result:
+            return result
+        try:
+            result["Discovered Networks"] = self.query(
+                flow["source"], flow["target"], flow["protocol"],
+                flow.get("port")
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    def check_many(self, flows, workers=1, chunk_size=256):
+        """
+        Answers the queries of many flows, in order, while they are
+        read. With more than one worker the flows are evaluated in
+        chunks by a process pool, each process holding its own copy of
+        the policy.
+
+        Args:
+            - flows (iterable(dict)): the flows to check.
+            - workers (int): number of processes, 1 checks in this one.
+            - chunk_size (int): flows sent to a process at once.
+
+        Returns:
+            (generator(dict)): the result of each flow.
+        """
+
+        if workers <= 1:
+            for flow in flows:
+                yield self.check(flow)
+            return
+
+        flows = iter(flows)
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=CliPolicy.share,
+            initargs=(self,)
+        ) as executor:
+            pending = collections.deque()
+            while True:
+                chunk = list(itertools.islice(flows, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(CliPolicy.check_shared, chunk))
+                if len(pending) > workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    @staticmethod
+    def share(policy):
+        """
+        Keeps the policy for check_shared, run once in every worker.
+
+        Args:
+            - policy (CliPolicy): the compiled policy.
+
+        Returns:
+            None.
+        """
+
+        CliPolicy.shared = policy
+
+    @staticmethod
+    def check_shared(flows):
+        """
+        Answers the queries of a chunk of flows in a worker process.
+
+        Args:
+            - flows (list(dict)): the flows to check.
+
+        Returns:
+            (list(dict)): the result of each flow.
+        """
+
+        return [CliPolicy.shared.check(flow) for flow in flows]
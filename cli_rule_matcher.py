@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+
+# transport, first port and last port of the predefined network services
+DEFINED_SERVICES = {
+    "DHCP": [("udp", 67, 68)],
+    "DNS": [("udp", 53, 53), ("tcp", 53, 53)],
+    "FTP": [("tcp", 20, 21)],
+    "HTTP": [("tcp", 80, 80)],
+    "HTTPS": [("tcp", 443, 443)],
+    "ICMP": [("icmp", None, None)],
+    "IMAP": [("tcp", 143, 143), ("tcp", 993, 993)],
+    "LDAP": [("tcp", 389, 389), ("udp", 389, 389), ("tcp", 636, 636)],
+    "MSFILESHARE": [("tcp", 445, 445)],
+    "NETBIOS": [("udp", 137, 138), ("tcp", 139, 139)],
+    "NTP": [("udp", 123, 123)],
+    "POP3": [("tcp", 110, 110), ("tcp", 995, 995)],
+    "RDP": [("tcp", 3389, 3389), ("udp", 3389, 3389)],
+    "SMTP": [("tcp", 25, 25), ("tcp", 465, 465), ("tcp", 587, 587)],
+    "SNMP": [("udp", 161, 162)],
+    "SSH": [("tcp", 22, 22)],
+}
+
+
+class CliRuleMatcher:
+    """
+    A class for a rule compiled for matching. Predefined services are
+    expanded into their transports and ports, and custom services are
+    parsed once, so each transport holds sorted, merged port intervals.
+    CliRuleIndex matches on them: a named service matches a rule listing
+    the service or allowing one of its ports, and a transport and port
+    match a rule whose services include that port, e.g. tcp 443 matches
+    a rule allowing HTTPS.
+    """
+
+    def __init__(self, rule):
+        """
+        Compiles a rule.
+
+        Args:
+            - rule (dict): the rule details.
+
+        Returns:
+            None.
+        """
+
+        self.services = set()
+        self.portless = set()
+        ranges = {}
+
+        for entry in rule["predefinedNetworkServices"] or []:
+            service = entry.upper()
+            self.services.add(service)
+            for transport, port_from, port_to in DEFINED_SERVICES.get(
+                service, []
+            ):
+                if port_from is None:
+                    self.portless.add(transport)
+                else:
+                    ranges.setdefault(transport, []).append(
+                        (port_from, port_to)
+                    )
+
+        for entry in rule["customNetworkServices"] or []:
+            transport = entry["transportType"].lower()
+            ranges.setdefault(transport, []).append(
+                (int(entry["portFrom"]), int(entry["portTo"]))
+            )
+
+        self.ports = {
+            transport: self.merge(intervals)
+            for transport, intervals in ranges.items()
+        }
+
+    @staticmethod
+    def merge(intervals):
+        """
+        Sorts and merges port intervals.
+
+        Args:
+            - intervals (list(tuple(int))): first and last ports.
+
+        Returns:
+            (tuple(list(int))): the first ports and the last ports.
+        """
+
+        merged = []
+        for port_from, port_to in sorted(intervals):
+            if merged and port_from <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], port_to)
+            else:
+                merged.append([port_from, port_to])
+        return (
+            [port_from for port_from, port_to in merged],
+            [port_to for port_from, port_to in merged],
+        )
+
+    @staticmethod
+    def flows(protocol, port):
+        """
+        Translates a query into the transports and ports it stands for.
+        A named service stands for each of its catalog entries, while a
+        transport stands for itself with the given port.
+
+        Args:
+            - protocol (str): tcp, udp, icmp or named service.
+            - port (str): destination port, None if not given.
+
+        Returns:
+            (list(tuple)): transport and port, None for no port.
+        """
+
+        service = DEFINED_SERVICES.get(protocol.upper())
+        if service is None:
+            return [(protocol.lower(), None if port is None else int(port))]
+
+        flows = []
+        for transport, port_from, port_to in service:
+            if port_from is None:
+                flows.append((transport, None))
+            else:
+                flows.extend(
+                    (transport, value)
+                    for value in range(port_from, port_to + 1)
+                )
+        return flows
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 
 from api_rules import ApiRules
+from api_trace import ApiTrace
 
 
+@ApiTrace.traced_class
 class CliRules:
     """
     A class for rule api calls via the cli utility.
@@ -52,5 +54,7 @@ class CliRules:
             return output
 
         elif args.name:
-            output = ApiRules().get(args.name)
+            output = ApiRules().get(
+                args.name, detail=not args.summary
+            )
             return output
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 
+from api_trace import ApiTrace
 from api_servers import ApiServers
 
 
+@ApiTrace.traced_class
 class CliServers:
     """
     A class for server api calls via the cli utility.
@@ -52,5 +54,7 @@ class CliServers:
             return output
 
         elif args.name:
-            output = ApiServers().get(args.name)
+            output = ApiServers().get(
+                args.name, detail=not args.summary
+            )
             return output
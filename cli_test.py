@@ -1,76 +1,30 @@
 #!/usr/bin/python3
 
-import ipaddress
+import sys
+import csv
+import json
+import itertools
 from api_rules import ApiRules
+from api_trace import ApiTrace
 from api_groups import ApiGroups
+from cli_policy import CliPolicy
 from api_networks import ApiNetworks
 from api_client_connectors import ApiClientConnectors
 
-DEFINED_SERVICES = [
-    "DHCP",
-    "DNS",
-    "FTP",
-    "HTTP",
-    "HTTPS",
-    "ICMP",
-    "IMAP",
-    "LDAP",
-    "MSFILESHARE",
-    "NetBIOS",
-    "NTP",
-    "POP3",
-    "RDP",
-    "SMTP",
-    "SNMP",
-    "SSH"
-]
-
 
+@ApiTrace.traced_class
 class CliTest:
     """
     A class for for combining various api calls and logic to provide
     testing functionality via the cli utility.
     """
 
-    def build_member_list(self, values):
-        """
-        A function for extracting individual members from groups,
-        connectors, servers, and users.
-
-        Args:
-            - values (dict): a dictionary containing node details.
-
-        Returns:
-            - member_list (list): a full list of nodes from object.
-        """
-
-        member_list = []
-        for value in values:
-
-            if value["type"] == "group":
-                nodes = ApiGroups().get_members(value["name"])
-                if nodes:
-                    for node in nodes:
-                        if node["userType"] == "GATEWAY":
-                            cc = self.get_cc_targets(node["name"])
-                            member_list.extend(cc)
-                        member_list.append(node["name"])
-
-            elif value["type"] == "gateway":
-                cc = self.get_cc_targets(value["name"])
-                member_list.extend(cc)
-                member_list.append(value["name"])
-
-            else:
-                member_list.append(value["name"])
-
-        return member_list
-
     def find_network(self, args):
         """
         Finds a matching network for the specified parameters. At this time
         this function is missing support for including criteria for context.
         This function will only find networks by source, target, and ip rule.
+        The networks are compiled into a CliPolicy once and queried.
 
         Args:
             - args (obj): argparse object containing match criteria.
@@ -79,29 +33,10 @@ class CliTest:
             - reults (dict): all identified networks that matched.
         """
 
-        networks = ApiNetworks().get_all()
-        network_hits = []
-        for network in networks:
-            sources = network["topology"]["sourceNobs"]
-            targets = network["topology"]["targetNobs"]
-            new_sources = self.build_member_list(sources)
-            new_targets = self.build_member_list(targets)
-            rule = network["rules"]
-            rule = self.validate_rule(rule, args.protocol, args.dport)
-
-            if not rule:
-                continue
-
-            if network["type"] == "MESH":
-
-                if args.source in new_sources and args.target in new_sources:
-
-                    network_hits.append(network["name"])
-
-            elif network["type"] == "HUB":
-                if args.source in new_sources and args.target in new_targets:
-
-                    network_hits.append(network["name"])
+        policy = self.load_policy()
+        network_hits = policy.query(
+            args.source, args.target, args.protocol, args.dport
+        )
 
         results = {
             "Discovered Networks": network_hits
@@ -109,87 +44,123 @@ class CliTest:
 
         return results
 
-    def validate_rule(self, rule, protocol, port):
+    def find_flows(self, args):
         """
-        Used to determine if the specified rule matches the supplied
-        protocol and port.
+        Finds the matching networks for every flow in a file. The file
+        is opened before any api call, so a wrong path fails at once.
+        The networks are compiled once and the flows are read and
+        checked one by one, optionally spread over several processes.
 
         Args:
-            - rule (str): the rule name.
-            - protocol (str): tcp, udp, icmp or named service.
-            - port (str): converted to int, destination port.
+            - args (obj): argparse object with the flows file and the
+              number of workers.
 
         Returns:
-            - (boolean): True if match, False if no match.
+            - (generator(dict)): each flow with its discovered networks.
         """
 
-        if port is not None:
-            port = int(port)
+        if args.flows == "-":
+            file = sys.stdin
         else:
-            port = 99999
+            file = open(args.flows, newline="")
+        try:
+            policy = self.load_policy()
+            flows = self.read_flows(file)
+            yield from policy.check_many(flows, workers=args.workers)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+    @staticmethod
+    def read_flows(file):
+        """
+        Reads flows from a csv file with a source,target,protocol,port
+        header, or from a json lines file with objects using the same
+        keys. A json line that is not an object is returned with an
+        error key, so the other flows are still checked.
 
-        if rule is not None:
-            rule = rule[0]
-            rule = ApiRules().get(rule)
+        Args:
+            - file (obj): the open flows file.
 
-            predefined = rule["predefinedNetworkServices"]
-            custom = rule["customNetworkServices"]
+        Returns:
+            - (generator(dict)): source, target, protocol and port of
+              each flow, or the line number and error of a bad line.
+        """
 
-            if predefined is not None:
-                for entry in predefined:
-                    if entry == protocol.upper():
-                        return True
+        first = file.readline()
+        lines = itertools.chain([first], file)
+        if not first.lstrip().startswith("{"):
+            for record in csv.DictReader(lines, skipinitialspace=True):
+                yield CliTest.to_flow(record)
+            return
 
-            if custom is not None:
-                for entry in custom:
-                    port_from = int(entry["portFrom"])
-                    port_to = int(entry["portTo"])
-                    transport = entry["transportType"].lower()
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {"line": number, "error": f"{type(e).__name__}: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield {"line": number, "error": "not a json object"}
+                continue
+            yield CliTest.to_flow(record)
 
-                    if port_from <= port <= port_to and protocol == transport:
-                        return True
+    @staticmethod
+    def to_flow(record):
+        """
+        Turns a record of a flows file into a flow. The port may be
+        empty and may also be named dport.
 
-        return False
+        Args:
+            - record (dict): the fields of the record.
 
-    def get_cc_targets(self, name):
+        Returns:
+            - (dict): source, target, protocol and port of the flow.
         """
-        Used to retrieve the IP or DNS info the client connector advertises.
 
-        Args:
-            - name (str): the client connector name.
+        port = record.get("port", record.get("dport"))
+        if port is not None and not str(port).strip():
+            port = None
+        return {
+            "source": record.get("source"),
+            "target": record.get("target"),
+            "protocol": record.get("protocol"),
+            "port": None if port is None else str(port).strip(),
+        }
+
+    def load_policy(self):
+        """
+        Loads the networks and everything they reference and compiles
+        them into a policy. Groups, connectors and rules are each
+        fetched once, concurrently.
 
         Returns:
-            - (boolean): A list of nodes, IPs, and DNS entries.
+            - policy (CliPolicy): the compiled policy.
         """
 
-        cc_targets = []
-        cc = ApiClientConnectors().get(name)
-        ips = cc["gatewayIps"]
-        dns = cc["dnsHosts"]
-
-        if ips:
-            for ip in ips:
-                start = ip["from"]
-                stop = ip["to"]
-                if start == stop:
-                    cc_targets.append(start)
-                else:
-                    start = int(
-                        ipaddress.IPv4Address(start).packed.hex(), 16
-                    )
-
-                    stop = int(
-                        ipaddress.IPv4Address(stop).packed.hex(), 16
-                    )
-                    ip_range = range(start, stop + 1)
-                    for ip_int in ip_range:
-                        ip_addr = ipaddress.IPv4Address(ip_int)
-                        ip_addr = str(ip_addr).split("/")[0]
-                        cc_targets.append(ip_addr)
-
-        if dns:
-            for entry in dns:
-                host = entry["hostname"]
-                cc_targets.append(host)
-
-        return cc_targets
+        networks = ApiNetworks().get_all()
+        groups, connectors, rules = set(), set(), set()
+        for network in networks:
+            topology = network["topology"]
+            for node in topology["sourceNobs"] + topology["targetNobs"]:
+                if node["type"] == "group":
+                    groups.add(node["name"])
+                elif node["type"] == "gateway":
+                    connectors.add(node["name"])
+            if network["rules"]:
+                rules.add(network["rules"][0])
+
+        members = ApiGroups().get_members_many(sorted(groups))
+        for nodes in members.values():
+            for node in nodes or []:
+                if node["userType"] == "GATEWAY":
+                    connectors.add(node["name"])
+
+        connectors = ApiClientConnectors().get_many(sorted(connectors))
+        rules = ApiRules().get_many(sorted(rules))
+
+        policy = CliPolicy()
+        policy.compile(networks, members, connectors, rules)
+        return policy
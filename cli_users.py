@@ -2,8 +2,10 @@
 
 from api_idp import ApiIdp
 from api_users import ApiUsers
+from api_trace import ApiTrace
 
 
+@ApiTrace.traced_class
 class CliUsers:
     """
     A class for user api calls via the cli utility.
@@ -53,5 +55,7 @@ class CliUsers:
             return output
 
         elif args.name:
-            output = ApiUsers().get(args.name)
+            output = ApiUsers().get(
+                args.name, detail=not args.summary
+            )
             return output
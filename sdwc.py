@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 
+import sys
 import argparse
 from cli_test import CliTest
 from cli_users import CliUsers
@@ -10,6 +11,8 @@ from cli_servers import CliServers
 from cli_contexts import CliContexts
 from cli_networks import CliNetworks
 from cli_client_connectors import CliClientConnectors
+from api_trace import ApiTrace
+from api_deadline import ApiDeadline, ApiDeadlineExceeded
 
 SHOW = "show"
 CREATE = "create"
@@ -33,7 +36,14 @@ ARG_TARGET = "--target"
 ARG_SOURCE = "--source"
 ARG_IFACE = "--interface"
 ARG_PROTOCOL = "--protocol"
+ARG_FLOWS = "--flows"
+ARG_WORKERS = "--workers"
 ARG_SUBDOMAIN = "--subdomain"
+ARG_DEADLINE = "--deadline"
+ARG_SUMMARY = "--summary"
+ARG_METRICS = "--metrics"
+ARG_METRICS_FORMAT = "--metrics-format"
+ARG_TRACE = "--trace"
 
 
 class Sdwc:
@@ -54,6 +64,44 @@ class Sdwc:
             description="SD-WAN Client API CLI"
         )
 
+        self.parser.add_argument(
+            f"{ARG_DEADLINE}",
+            required=False,
+            type=ApiDeadline.from_text,
+            help=(
+                "(optional) time budget for the whole command, "
+                "e.g. 30s, 500ms, 2m"
+            )
+        )
+
+        self.parser.add_argument(
+            f"{ARG_METRICS}",
+            required=False,
+            metavar="FILE",
+            help=(
+                "(optional) report api call metrics when the command "
+                "finishes, to FILE or to stderr if FILE is -"
+            )
+        )
+
+        self.parser.add_argument(
+            f"{ARG_METRICS_FORMAT}",
+            required=False,
+            choices=["json", "prometheus"],
+            default="json",
+            help="(optional) metrics format, defaults to json"
+        )
+
+        self.parser.add_argument(
+            f"{ARG_TRACE}",
+            required=False,
+            metavar="FILE",
+            help=(
+                "(optional) write a chrome trace of the command and its "
+                "api calls to FILE"
+            )
+        )
+
         self.subparsers = self.parser.add_subparsers(
             dest="command"
         )
@@ -107,19 +155,19 @@ class Sdwc:
 
         test_network_parser.add_argument(
             f"{ARG_SOURCE}",
-            required=True,
+            required=False,
             help="the name of the traffic source"
         )
 
         test_network_parser.add_argument(
             f"{ARG_TARGET}",
-            required=True,
+            required=False,
             help="the destination IP, FQDN, domain, or node name"
         )
 
         test_network_parser.add_argument(
             f"{ARG_PROTOCOL}",
-            required=True,
+            required=False,
             help="icmp, tcp, udp or named service (e.g., rdp, dns, ftp)"
         )
 
@@ -132,6 +180,27 @@ class Sdwc:
             )
         )
 
+        test_network_parser.add_argument(
+            f"{ARG_FLOWS}",
+            required=False,
+            metavar="FILE",
+            help=(
+                "(optional) check every flow in a csv or json lines file "
+                "with source, target, protocol and port, - for stdin, "
+                "instead of --source, --target and --protocol"
+            )
+        )
+
+        test_network_parser.add_argument(
+            f"{ARG_WORKERS}",
+            required=False,
+            type=int,
+            default=1,
+            help="(optional) with --flows, number of processes to use"
+        )
+
+        self.test_network_parser = test_network_parser
+
         # END_SECTION: test sub-commands
 
         # BEGIN_SECTION: connector sub-commands
@@ -179,6 +248,13 @@ class Sdwc:
             help="name of the connector"
         )
 
+        show_connector_parser.add_argument(
+            f"{ARG_SUMMARY}",
+            required=False,
+            action="store_true",
+            help="(optional) with --name, skip the full detail lookup"
+        )
+
         # END_SECTION: connector sub-commands
 
         # BEGIN_SECTION: server sub-commands
@@ -226,6 +302,13 @@ class Sdwc:
             help="name of the server"
         )
 
+        show_server_parser.add_argument(
+            f"{ARG_SUMMARY}",
+            required=False,
+            action="store_true",
+            help="(optional) with --name, skip the full detail lookup"
+        )
+
         # END_SECTION: server sub-commands
 
         # BEGIN_SECTION: user sub-commands
@@ -281,6 +364,13 @@ class Sdwc:
             help="add \" around name if spaces present"
         )
 
+        show_user_parser.add_argument(
+            f"{ARG_SUMMARY}",
+            required=False,
+            action="store_true",
+            help="(optional) with --name, skip the full detail lookup"
+        )
+
         # END_SECTION: user sub-commands
 
         # BEGIN_SECTION: rules sub-commands
@@ -323,6 +413,13 @@ class Sdwc:
             help="add \" around name if spaces present"
         )
 
+        show_rule_parser.add_argument(
+            f"{ARG_SUMMARY}",
+            required=False,
+            action="store_true",
+            help="(optional) with --name, skip the full detail lookup"
+        )
+
         # END_SECTION: user sub-commands
 
         # BEGIN_SECTION: context sub-commands
@@ -365,6 +462,13 @@ class Sdwc:
             help="add \" around name if spaces present"
         )
 
+        show_context_parser.add_argument(
+            f"{ARG_SUMMARY}",
+            required=False,
+            action="store_true",
+            help="(optional) with --name, skip the full detail lookup"
+        )
+
         # END_SECTION: user sub-commands
 
         # BEGIN_SECTION: group sub-commands
@@ -405,6 +509,13 @@ class Sdwc:
             help="add \" around name if spaces present"
         )
 
+        show_group_parser.add_argument(
+            f"{ARG_SUMMARY}",
+            required=False,
+            action="store_true",
+            help="(optional) with --name, skip the full detail lookup"
+        )
+
         # END_SECTION: group sub-commands
 
         # BEGIN_SECTION: network sub-commands
@@ -486,8 +597,16 @@ class Sdwc:
             help="add \" around name if spaces present"
         )
 
+        show_network_parser.add_argument(
+            f"{ARG_SUMMARY}",
+            required=False,
+            action="store_true",
+            help="(optional) with --name, skip the full detail lookup"
+        )
+
         # END_SECTION: network sub-commands
 
+    @ApiTrace.traced
     def execute_command(self, args):
         """
         Provides command execution logic for the parsed input.
@@ -598,6 +717,15 @@ class Sdwc:
         elif args.command == "test":
 
             if args.object == "networks":
+                if args.flows is not None:
+                    for result in CliTest().find_flows(args):
+                        CliHelper().print_jsonl(result)
+                    return
+                if None in (args.source, args.target, args.protocol):
+                    self.test_network_parser.error(
+                        "the following arguments are required: "
+                        "--source, --target, --protocol"
+                    )
                 result = CliTest().find_network(args)
                 CliHelper().print_json(result)
 
@@ -612,7 +740,25 @@ def main():
     """
     sdwc = Sdwc()
     args = sdwc.parser.parse_args()
-    sdwc.execute_command(args)
+
+    if args.trace is not None:
+        ApiTrace.start()
+
+    try:
+        if args.deadline is None:
+            sdwc.execute_command(args)
+        else:
+            with args.deadline:
+                sdwc.execute_command(args)
+    except ApiDeadlineExceeded as e:
+        print(f"ERROR! {e}")
+        sys.exit(1)
+    finally:
+        if args.metrics is not None:
+            CliHelper().write_metrics(args.metrics, args.metrics_format)
+        if args.trace is not None:
+            ApiTrace.stop()
+            ApiTrace.write_chrome(args.trace)
 
 
 if __name__ == "__main__":